@@ -0,0 +1,76 @@
+import sys
+import time
+from profiling import profiler
+
+FRAME_DELAY = 16    #Milliseconds between two frames of the animations (about 60 frames per second).
+viewports = set()    #Scrolled canvases. The widgets inside them are only visible in the part of the page that is scrolled into view.
+
+def in_viewport(widget):
+    #Returns False if the widget is inside a scrolled canvas but out of its visible area.
+    parent = widget.master
+    while parent is not None:
+        if parent in viewports:
+            top = widget.winfo_rooty() - parent.winfo_rooty()
+            if top + widget.winfo_height() < 0 or top > parent.winfo_height():
+                return False
+        parent = parent.master
+    return True
+
+class Animator:
+    def __init__(self):
+        self.animations = {}    #Saves for each running animation its widget, its step function, its start time, its name and its duration.
+        self.window = None
+        self.timer = None
+
+    def start(self, key, widget, step, name="animation", started=None, duration=None):
+        #Starts the animation identified by "key", or restarts it from the beginning if it is already running.
+        #"step" receives the seconds elapsed since the start and returns True while the animation has not finished.
+        #"name" identifies the kind of animation in the profiler, and "started" resumes an animation that was started earlier.
+        #"duration" is the number of seconds after which the animation has finished, so it also ends while it is not visible.
+        started = time.perf_counter() if started is None else started
+        self.animations[key] = (widget, step, started, name, duration)
+        if self.timer is None:    #A single timer drives all the animations, and it only runs while there is at least one.
+            self.window = widget.winfo_toplevel()
+            self.schedule()
+
+    def schedule(self):
+        self.expected = time.perf_counter() + FRAME_DELAY / 1000    #Time when the next frame should run, used to measure the delay of the timer.
+        self.timer = self.window.after(FRAME_DELAY, self.tick)
+
+    def stop(self, key):
+        self.animations.pop(key, None)
+
+    def finish(self, key, start):
+        #Removes the animation, unless it has been restarted by its step.
+        if key in self.animations and self.animations[key][2] == start:
+            del self.animations[key]
+
+    def tick(self):
+        now = time.perf_counter()
+        profiler.count("after_latency_ms", (now - self.expected) * 1000)
+        try:
+            for key, (widget, step, start, name, duration) in list(self.animations.items()):
+                try:
+                    if not widget.winfo_exists():    #Animations whose widget has been destroyed are removed.
+                        self.animations.pop(key, None)
+                    elif widget.winfo_viewable() and in_viewport(widget):
+                        with profiler.span(name):
+                            running = step(now - start)
+                        if not running:
+                            self.finish(key, start)
+                    #Hidden and scrolled out animations are not redrawn, but their time keeps running so they are up to date when shown again.
+                    #Once their duration has passed, their last frame is drawn and they are removed, so the timer does not run for them forever.
+                    elif duration is not None and now - start >= duration:
+                        with profiler.span(name):
+                            step(now - start)
+                        self.finish(key, start)
+                except Exception:    #A failing animation is removed and reported, and the other ones keep running.
+                    self.finish(key, start)
+                    self.window.report_callback_exception(*sys.exc_info())
+        finally:
+            if self.animations:
+                self.schedule()
+            else:
+                self.timer = None
+
+animator = Animator()    #Animator shared by the whole application.
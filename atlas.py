@@ -0,0 +1,103 @@
+import os
+import json
+import mmap
+import struct
+import argparse
+import threading
+from PIL import Image
+
+ATLAS = ".cache/images.atlas"    #File with the pixels of every image of the application at the size it is displayed.
+MAGIC = b"SOLARATLAS1\n"
+ALIGNMENT = 64    #The pixels of each image start at a multiple of this number of bytes.
+
+def entry_key(path, size):
+    return f"{os.path.abspath(path)}|{size[0]}x{size[1]}"
+
+def source_signature(path):
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+def pack(images, path=None):
+    #Writes the images one after the other as raw RGBA pixels, followed by an index with the position of each one.
+    #The images are resized once with the cache of resized images, and written one at a time, so only one is in memory.
+    from image_cache import load_resized    #The function is imported here due to a circular import.
+    path = path or ATLAS
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    index = {}
+    with open(temporary, "wb") as file:
+        file.write(MAGIC)
+        file.write(struct.pack("<Q", 0))    #Position of the index, written once the pixels are known.
+        for source, size in images:
+            if not os.path.exists(source):
+                continue
+            with load_resized(source, size) as image:
+                pixels = image.convert("RGBA").tobytes()
+            file.write(b"\0" * (-file.tell() % ALIGNMENT))
+            index[entry_key(source, size)] = {"offset": file.tell(), "size": list(size), "source": source_signature(source)}
+            file.write(pixels)
+        index_offset = file.tell()
+        file.write(json.dumps(index).encode("utf-8"))
+        file.seek(len(MAGIC))
+        file.write(struct.pack("<Q", index_offset))
+    #The atlas is written under another name and then renamed. Instances that have the old file mapped keep reading it without errors.
+    os.replace(temporary, path)
+    reset()    #The next image is read from the new atlas.
+    return len(index)
+
+class Atlas:
+    def __init__(self, path):
+        with open(path, "rb") as file:
+            #The file is mapped read-only, so the operating system shares its pages between all the instances of the application.
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.map[:len(MAGIC)] != MAGIC:
+            self.map.close()
+            raise ValueError(f"{path} is not an image atlas.")
+        index_offset, = struct.unpack_from("<Q", self.map, len(MAGIC))
+        self.index = json.loads(self.map[index_offset:].decode("utf-8"))
+        self.buffer = memoryview(self.map)
+
+    def get(self, path, size):
+        #Returns the image without decoding or copying its pixels, or None if it is not in the atlas or its source has changed since it was packed.
+        entry = self.index.get(entry_key(path, size))
+        if entry is None or entry["size"] != list(size):
+            return None
+        try:
+            if entry["source"] != source_signature(path):
+                return None
+        except OSError:
+            return None
+        width, height = size
+        pixels = self.buffer[entry["offset"]:entry["offset"] + width * height * 4]
+        return Image.frombuffer("RGBA", (width, height), pixels, "raw", "RGBA", 0, 1)
+
+atlas = None    #Atlas shared by the whole application, opened the first time an image is requested.
+lock = threading.Lock()    #The images are requested from several loader threads.
+
+def load_atlas(path=None):
+    #Opens the atlas once. Returns None if it has not been packed, and the images are then read from the cache of resized images.
+    global atlas
+    with lock:
+        if atlas is None:
+            try:
+                atlas = Atlas(path or ATLAS)
+            except (OSError, ValueError):
+                atlas = False
+        return atlas or None
+
+def reset():
+    #Forgets the opened atlas, so the next request opens the current file. Images that use the old one keep it mapped while they exist.
+    global atlas
+    with lock:
+        atlas = None
+
+def main(argv=None):
+    from image_cache import application_images    #The function is imported here due to a circular import.
+    parser = argparse.ArgumentParser(description="Pack the images of the application into a single file of decoded pixels.")
+    parser.add_argument("--screen-width", type=int, help="also pack the home page image for this screen width")
+    args = parser.parse_args(argv)
+    count = pack(application_images(args.screen_width))
+    print(f"{count} images packed in {ATLAS}")
+
+if __name__ == "__main__":
+    main()
@@ -1,71 +1,100 @@
 import tkinter as tk
 from tkinter import ttk
 import time
-import threading
-import json
-import random
+from animation import animator
+from styles import registry
+from bodydata import load_store
 
-with open("texts/composition_data.txt", "r") as file:
-    composition_data = json.load(file)
+BAR_SPEED = 20    #Percentage points filled by each bar per second.
 
-def update_bars(progress_bars, labels, targets, steps):
-    for i in range(steps):    #Controls how many times all progress bars will be updated.
-        for bar, target, label in zip(progress_bars, targets, labels):
-            current_value = bar["value"]    #Gets the current value of the bar.
-            if current_value < target:
-                # Calculate the new value as the minimun between the target and the current value incremented by 1.
-                new_value = min(target, current_value + 1)
-                bar["value"] = new_value    #Updates the progress bar to the new value.
-                # Updates the associated label text with the new value, formatted to four decimal places.
-                label.config(text=f"{new_value:.4f}%")
-        time.sleep(0.05)
+def update_bars(progress_bars, labels, targets, elapsed):
+    running = False
+    for bar, target, label in zip(progress_bars, targets, labels):
+        #The value of each bar is calculated from the time elapsed since "Run" was clicked, as the minimum between the target and the filled percentage.
+        new_value = min(target, elapsed * BAR_SPEED)
+        if bar["value"] != new_value:
+            bar["value"] = new_value    #Updates the progress bar to the new value.
+            # Updates the associated label text with the new value, formatted to four decimal places.
+            label.config(text=f"{new_value:.4f}%")
+        running = running or new_value < target
+    return running    #The animation continues while any bar has not reached its target.
 
-def create_bars(frame, body):
-    frame.pack_forget()    #Clears the frame.
-    progress_bars, labels = [], []    #Saves the progress bars and the labels that will display percentage values.
+class BarPanel:
+    def __init__(self, frame):
+        #The widgets are created once and shared by all the bodies. Each body only keeps the time when "Run" was clicked.
+        self.progress_bars, self.labels, self.texts = [], [], []    #Saves the progress bars, the labels that will display percentage values and the compound names.
+        self.percentages = []
+        self.state = None
 
-    # Access the "composition_data" dictionary with the key "body" to obtain the chemical composition of the celestial body.
-    compositions = composition_data[body]
-    compounds, percentages = list(compositions.keys()), list(compositions.values())
+        #Creates a button that when clicked calls the "run_bars" function, which starts the progress of the bars.
+        start_button = tk.Button(frame, text="Run", command=self.run_bars, bg="white")
+        start_button.pack(pady=(10, 5), anchor="center")
 
-    styles = {}
-    for compound in compounds:
-        color = f"#{random.randint(0, 0xFFFFFF):06x}"   #For each compound, a random color is generated in RGB hexadecimal format.
-        styles[compound] = color
-    style = ttk.Style()
-    style.theme_use("default")    #Change the current theme to the default theme.
-    for compound, color in styles.items():
-        #Define a custom style for each progress bar.
-        style.configure(f"{compound}.Vertical.TProgressbar", troughcolor="white", background=color, thickness=40, bordercolor="white")
+        #Create a frame inside the main frame to hold the progress bars.
+        self.bar_frame = tk.Frame(frame, bg="white")
+        self.bar_frame.pack(pady=(5, 10), anchor="center")
 
-    def run_bars():
-        #Reset the bars to 0.
-        for bar in progress_bars:
-            bar["value"] = 0
-        threading.Thread(target=update_bars, args=(progress_bars, labels, percentages, 100)).start()
-
-    #Creates a button that when clicked calls the "run_bars" function, which starts the progress of the bars.
-    start_button = tk.Button(frame, text="Run", command=run_bars, bg="white")
-    start_button.pack(pady=(10, 5), anchor="center")
-
-    #Create a frame inside the main frame to hold the progress bars.
-    bar_frame = tk.Frame(frame, bg="white")
-    bar_frame.pack(pady=(5, 10), anchor="center")
-
-    for i, compound in enumerate(compounds):
+    def add_column(self):
+        i = len(self.progress_bars)
         #Creates a label initialized with the text "0%".
-        label = tk.Label(bar_frame, text="0%", bg="white")
-        label.grid(row=0, column=i, pady=5)
-        labels.append(label)
+        label = tk.Label(self.bar_frame, text="0%", bg="white")
+        self.labels.append(label)
         #Create progress bars starting at 0%
-        bar = ttk.Progressbar(bar_frame, orient="vertical", length=400, mode="determinate", style=f"{compound}.Vertical.TProgressbar")
-        bar.grid(row=1, column=i, padx=10)
+        bar = ttk.Progressbar(self.bar_frame, orient="vertical", length=400, mode="determinate")
         bar["value"] = 0
-        progress_bars.append(bar)
+        self.progress_bars.append(bar)
         #Create a canvas to display compound texts tilted 45 degrees.
-        text_frame = tk.Canvas(bar_frame, width=100, height=120, bg="white", bd=0, highlightthickness=0)
-        text_frame.grid(row=2, column=i, pady=5)
-        text_frame.create_text(70, 35, text=compound, angle=-45, font=("Arial", 10), anchor="n")
+        text_frame = tk.Canvas(self.bar_frame, width=100, height=120, bg="white", bd=0, highlightthickness=0)
+        text_frame.text = text_frame.create_text(70, 35, text="", angle=-45, font=("Arial", 10), anchor="n")
+        self.texts.append(text_frame)
+        #The columns are created when a body is displayed, after the rest of the body view has taken the theme of the application.
+        registry.apply(label)
+        registry.apply(text_frame)
+
+    def bind(self, body, state):
+        self.state = state
+        # Read the chemical composition of the celestial body from the database of the bodies.
+        compositions = load_store().composition(body)
+        compounds, self.percentages = list(compositions.keys()), list(compositions.values())
+
+        #Only the columns needed by the body are displayed. Columns are created when a body has more compounds than any previous one.
+        while len(self.progress_bars) < len(compounds):
+            self.add_column()
+        for i, (bar, label, text_frame) in enumerate(zip(self.progress_bars, self.labels, self.texts)):
+            if i < len(compounds):
+                bar.config(style=registry.bar_style(compounds[i]))    #Each compound has a fixed color, and its style is only created the first time.
+                text_frame.itemconfigure(text_frame.text, text=compounds[i])
+                label.grid(row=0, column=i, pady=5)
+                bar.grid(row=1, column=i, padx=10)
+                text_frame.grid(row=2, column=i, pady=5)
+            else:
+                label.grid_remove()
+                bar.grid_remove()
+                text_frame.grid_remove()
+
+        animator.stop(self.bar_frame)
+        if state.bars_start is None:    #The bars of a body where "Run" has not been clicked are empty.
+            self.reset()
+        else:    #Otherwise the bars show the progress reached since "Run" was clicked, and keep moving if they have not finished.
+            self.step(time.perf_counter() - state.bars_start)
+            animator.start(self.bar_frame, self.bar_frame, self.step, "bars_update", started=state.bars_start, duration=self.duration())
+
+    def reset(self):
+        #Reset the bars to 0.
+        for bar, label in zip(self.progress_bars, self.labels):
+            bar["value"] = 0
+            label.config(text="0%")
+
+    def duration(self):
+        #Seconds the bars take to reach their targets.
+        return max(self.percentages, default=0) / BAR_SPEED
+
+    def step(self, elapsed):
+        count = len(self.percentages)
+        return update_bars(self.progress_bars[:count], self.labels[:count], self.percentages, elapsed)
 
-def setup_celestial(frame, body):
-    create_bars(frame, body)
+    def run_bars(self):
+        self.reset()
+        #The bars are animated by the shared animator in the main loop. Clicking "Run" again restarts the animation instead of starting another one.
+        self.state.bars_start = time.perf_counter()
+        animator.start(self.bar_frame, self.bar_frame, self.step, "bars_update", started=self.state.bars_start, duration=self.duration())
@@ -0,0 +1,229 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import resource
+import tempfile
+import subprocess
+import statistics
+import tracemalloc
+
+TIMEOUT = 30    #Maximum number of seconds to wait for the application to finish a task.
+THRESHOLD = 0.2    #A metric is a regression if it is more than 20% slower than in the compared results.
+
+def start_display():
+    #Tkinter needs a display. If there is none, a virtual one is started with Xvfb, which writes its display number on the given pipe.
+    if os.environ.get("DISPLAY"):
+        return None
+    xvfb = shutil.which("Xvfb")
+    if xvfb is None:
+        sys.exit("No display available: set DISPLAY or install Xvfb.")
+    read, write = os.pipe()
+    process = subprocess.Popen([xvfb, "-displayfd", str(write), "-screen", "0", "1920x1080x24", "-nolisten", "tcp"], pass_fds=(write,), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    os.close(write)
+    with os.fdopen(read) as pipe:
+        number = pipe.readline().strip()
+    if not number:
+        process.kill()
+        sys.exit("Xvfb could not be started.")
+    os.environ["DISPLAY"] = f":{number}"
+    return process
+
+def use_cache(directory):
+    #The benchmark uses its own cache folder so the cold measurements are not affected by the cache of the application.
+    import image_cache
+    import bodydata
+    import atlas
+    image_cache.CACHE_DIR = os.path.join(directory, "images")
+    atlas.ATLAS = os.path.join(directory, "images.atlas")    #The atlas is not packed, so the images are read from the cache.
+    atlas.reset()
+    bodydata.DATABASE = os.path.join(directory, "bodies.sqlite")
+    bodydata.store = None
+
+def max_rss_kb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss    #Kilobytes on Linux.
+
+def pump(window, condition):
+    #Runs the main loop until the condition is true.
+    deadline = time.perf_counter() + TIMEOUT
+    while not condition():
+        if time.perf_counter() > deadline:
+            raise TimeoutError("The application did not finish in time.")
+        window.update()
+        time.sleep(0.001)
+
+def images_loaded():
+    from image_loader import loader
+    import slideshow
+    return loader.pending == 0 and not slideshow.pending
+
+def find_button(widget, text):
+    #Searches the widget and its children for the button with the given text.
+    for child in widget.winfo_children():
+        if child.winfo_class() == "Button" and child.cget("text") == text:
+            return child
+        found = find_button(child, text)
+        if found is not None:
+            return found
+    return None
+
+def measure(results, name, function):
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    function()
+    seconds = time.perf_counter() - start
+    results[name] = {"seconds": seconds, "peak_kb": tracemalloc.get_traced_memory()[1] // 1024}
+    return seconds
+
+def scroll_into_view(ency, widget):
+    #The animations are only drawn while their widget is visible, so the page is scrolled to it before they are measured.
+    ency.window.update_idletasks()
+    ency.scroller.jump((widget.winfo_rooty() - ency.body_scroller.winfo_rooty()) / ency.scroller.height())
+    ency.window.update()
+
+def measure_ticks(results, name, window, start):
+    #Runs an animation until it finishes and measures how long each frame of the shared animator takes.
+    from animation import animator
+    durations = []
+    tick = animator.tick
+    def timed_tick():
+        begin = time.perf_counter()
+        tick()
+        durations.append(time.perf_counter() - begin)
+    animator.tick = timed_tick
+    try:
+        measure(results, name, lambda: (start(), pump(window, lambda: not animator.animations)))
+    finally:
+        del animator.tick
+    results[name]["frames"] = len(durations)
+    results[name]["frame_mean_seconds"] = statistics.mean(durations) if durations else 0
+    results[name]["frame_max_seconds"] = max(durations, default=0)
+
+def startup(directory):
+    #Measures the time from the imports until the home page is displayed, in a new process so nothing is already loaded.
+    start = time.perf_counter()
+    use_cache(directory)
+    import tkinter as tk
+    from project import SolarSystem
+    window = tk.Tk()
+    SolarSystem(window, prefetch=False)
+    window.update()
+    seconds = time.perf_counter() - start
+    window.destroy()
+    return {"seconds": seconds, "max_rss_kb": max_rss_kb()}
+
+def run_startup(directory, repeat):
+    #The first launch has an empty cache (cold), the following ones reuse it (warm).
+    command = [sys.executable, os.path.abspath(__file__), "--startup", directory]
+    runs = [json.loads(subprocess.run(command, check=True, capture_output=True, text=True).stdout) for _ in range(repeat + 1)]
+    cold, warm = runs[0], runs[1:]
+    return {"startup_cold": cold, "startup_warm": {"seconds": statistics.median(run["seconds"] for run in warm), "max_rss_kb": max(run["max_rss_kb"] for run in warm)}}
+
+def run_interactions(directory):
+    use_cache(directory)
+    import tkinter as tk
+    from project import SolarSystem
+    results = {}
+    tracemalloc.start()
+    window = tk.Tk()
+    ency = SolarSystem(window, prefetch=False)
+    width, height = window.winfo_screenwidth(), window.winfo_screenheight()
+    names = ency.store.names()
+    pump(window, images_loaded)
+
+    measure(results, "load_texts", lambda: [ency.load_texts(index) for index in range(len(names))])
+    measure(results, "frame_build", lambda: ency.setup_frames(width, height))
+    #Displays every body for the first time, which binds the body view to it and loads its images.
+    for index, name in enumerate(names):
+        measure(results, f"body_bind.{name}", lambda: (ency.manage_frames(width, height, index=index), pump(window, images_loaded)))
+
+    def switch_all():
+        for index in range(len(names)):
+            ency.manage_frames(width, height, index=index)
+            window.update_idletasks()
+        ency.manage_frames(width, height, ency.homepage_frame)
+        window.update_idletasks()
+    seconds = measure(results, "manage_frames_switch", switch_all)
+    results["manage_frames_switch"]["mean_seconds"] = seconds / (len(names) + 1)
+
+    #Displays the first body and moves through its slideshow twice.
+    from image_loader import loader
+    ency.manage_frames(width, height, index=0)
+    window.update()
+    next_button = find_button(ency.body_scroller, "►")
+    label = ency.slides.label
+    clicks = 2 * ency.store.body(names[0])["images"]
+    def navigate():
+        for _ in range(clicks):
+            next_button.invoke()
+            pump(window, lambda: label.image is not loader.placeholder(472, 472))
+    seconds = measure(results, "slideshow_navigation", navigate)
+    results["slideshow_navigation"]["mean_seconds"] = seconds / clicks
+
+    scroll_into_view(ency, ency.bar_panel.bar_frame)
+    measure_ticks(results, "bar_animation", window, find_button(ency.body_scroller, "Run").invoke)
+    scroll_into_view(ency, ency.gravity_panel.canvas)
+    measure_ticks(results, "fall_simulation", window, find_button(ency.body_scroller, "Start").invoke)
+
+    window.destroy()
+    tracemalloc.stop()
+    results["interactions_max_rss_kb"] = {"max_rss_kb": max_rss_kb()}
+    return results
+
+def compare(old, new, threshold=THRESHOLD):
+    #Prints the change of every metric measured in both results and returns the ones that are slower than the threshold.
+    regressions = []
+    for name, metric in new["metrics"].items():
+        before = old["metrics"].get(name, {}).get("seconds")
+        if before is None or "seconds" not in metric:
+            continue
+        change = (metric["seconds"] - before) / before if before else 0
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:32} {before:10.4f} s {metric['seconds']:10.4f} s {change:+8.1%}{flag}")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the startup and the interactions of the application.")
+    parser.add_argument("--output", default="benchmark.json", help="file where the results are written")
+    parser.add_argument("--compare", help="previous results to compare with")
+    parser.add_argument("--repeat", type=int, default=3, help="number of warm startups")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="relative slowdown reported as a regression")
+    parser.add_argument("--startup", help=argparse.SUPPRESS)    #Used internally to measure one startup in a new process.
+    args = parser.parse_args(argv)
+
+    display = start_display()
+    try:
+        if args.startup:
+            print(json.dumps(startup(args.startup)))
+            return 0
+        directory = tempfile.mkdtemp(prefix="solar-benchmark-")
+        try:
+            metrics = run_startup(directory, args.repeat)
+            metrics.update(run_interactions(directory))
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+    finally:
+        if display is not None:
+            display.terminate()
+
+    results = {"timestamp": time.time(), "python": platform.python_version(), "platform": platform.platform(), "metrics": metrics}
+    with open(args.output, "w") as file:
+        json.dump(results, file, indent=4)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as file:
+            regressions = compare(json.load(file), results, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regressions: {', '.join(regressions)}")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+import os
+import re
+import glob
+import json
+import sqlite3
+import argparse
+import threading
+
+#Text files with the data of the bodies. The database is compiled from them and compiled again only when one of them changes.
+SOURCES = {"bodies": "texts/bodies.txt", "characteristics": "texts/characteristics.txt", "composition": "texts/composition_data.txt"}
+DATABASE = ".cache/bodies.sqlite"
+PHOTOS = "images/{}_photos"    #Folder with the photos of each body. The photos are discovered from its content.
+SOURCE_ERRORS = (ValueError, KeyError, OSError, sqlite3.Error)    #Raised when the sources cannot be read or compiled, for example while a file is half saved.
+
+def parse_characteristics(path):
+    #The file is opened in read mode with the option "encoding=utf-8" to handle special characters and mathematical symbols.
+    with open(path, "r", encoding="utf-8") as file:
+        lines = file.readlines()
+
+    data = {}    #Saves the categories and their respective information.
+    title = None    #Saves the name of the data category (physical_body_name, orbital_body_name).
+    texts_list = []    #Saves the lines related to that category.
+
+    def sentences():
+        if title and texts_list:
+            #The lines of the category are joined with newlines and saved in data.
+            data[title] = "\n".join(texts_list)
+
+    for line in lines:
+        line = line.strip()
+        if line.endswith(":"):    #If the line ends with ":", call "sentences()" to save the previous category.
+            sentences()
+            title = line[:-1]    #Update title with the current line, removing the ":".
+            texts_list = []    #Reset "texts_list" to start accumulating new lines for this category.
+        elif line:
+            texts_list.append(line.replace("\\n", "\n"))    #If the line is not empty, replace "\n" with a real newline and add the line to "texts_list".
+    sentences()
+    return data
+
+def natural_key(path):
+    #Sorts "Image10.png" after "Image9.png".
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", path)]
+
+def discover_photos(name):
+    return sorted(glob.glob(os.path.join(PHOTOS.format(name), "*.png")), key=natural_key)
+
+def signature(sources=SOURCES):
+    #Describes the current version of the source files with their modification time and size.
+    stats = {name: os.stat(path) for name, path in sources.items()}
+    #The modification time of a folder changes when a file is added or removed, so adding photos also compiles the database again.
+    stats.update({folder: os.stat(folder) for folder in glob.glob(PHOTOS.format("*"))})
+    return json.dumps({name: [stat.st_mtime_ns, stat.st_size] for name, stat in sorted(stats.items())})
+
+def build(database=DATABASE, sources=SOURCES):
+    with open(sources["bodies"], "r", encoding="utf-8") as file:
+        bodies = json.load(file)
+    with open(sources["composition"], "r", encoding="utf-8") as file:
+        composition_data = json.load(file)
+    characteristics = parse_characteristics(sources["characteristics"])
+
+    os.makedirs(os.path.dirname(database), exist_ok=True)
+    temporary = f"{database}.{os.getpid()}.tmp"
+    if os.path.exists(temporary):
+        os.remove(temporary)
+    #The database is written under another name and then renamed, so other instances never read a half written file.
+    connection = sqlite3.connect(temporary)
+    try:
+        with connection:
+            connection.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+            connection.execute("CREATE TABLE bodies (position INTEGER, name TEXT PRIMARY KEY, aliases TEXT, photos TEXT, acceleration REAL, header TEXT, physical_title TEXT, physical TEXT, physical_size TEXT, orbital_title TEXT, orbital TEXT, orbital_size TEXT)")
+            connection.execute("CREATE TABLE composition (body TEXT, position INTEGER, compound TEXT, percentage REAL, PRIMARY KEY (body, position))")
+            connection.execute("INSERT INTO meta VALUES ('signature', ?)", (signature(sources),))
+            for position, body in enumerate(bodies):
+                name = body["name"]
+                connection.execute("INSERT INTO bodies VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", (
+                    position, name, json.dumps(body.get("aliases", [])), json.dumps(discover_photos(name)), body["acceleration"], body["header"],
+                    characteristics[body["physical_title"]], characteristics[f"physical_{name}"], json.dumps(body["physical_size"]),
+                    characteristics[body["orbital_title"]], characteristics[f"orbital_{name}"], json.dumps(body["orbital_size"])))
+                for compound_position, (compound, percentage) in enumerate(composition_data.get(name, {}).items()):
+                    connection.execute("INSERT INTO composition VALUES (?, ?, ?, ?)", (name, compound_position, compound, percentage))
+    except Exception:    #Sources that cannot be compiled leave no half written file behind, and the previous database is kept.
+        connection.close()
+        os.remove(temporary)
+        raise
+    connection.close()
+    os.replace(temporary, database)
+
+def is_current(database=DATABASE, sources=SOURCES):
+    if not os.path.exists(database):
+        return False
+    try:
+        connection = sqlite3.connect(database)
+        try:
+            row = connection.execute("SELECT value FROM meta WHERE key = 'signature'").fetchone()
+        finally:
+            connection.close()
+    except sqlite3.DatabaseError:    #A damaged database is compiled again.
+        return False
+    return row is not None and row[0] == signature(sources)
+
+class BodyStore:
+    def __init__(self, database=DATABASE):
+        #The connection can be used from the loader threads. The lock makes sure only one query runs at a time.
+        self.connection = sqlite3.connect(database, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.bodies = {}    #Bodies already read from the database.
+        self.compositions = {}
+        with self.lock:
+            self.order = [row[0] for row in self.connection.execute("SELECT name FROM bodies ORDER BY position")]
+            self.signature = self.connection.execute("SELECT value FROM meta WHERE key = 'signature'").fetchone()[0]
+
+    def names(self):
+        return list(self.order)
+
+    def index(self, name):
+        return self.order.index(name)
+
+    def aliases(self):
+        #Returns the other names of every body, in the order of the source file. They are all read at once to build the search index.
+        with self.lock:
+            rows = self.connection.execute("SELECT name, aliases FROM bodies ORDER BY position").fetchall()
+        return {name: json.loads(aliases) for name, aliases in rows}
+
+    def accelerations(self):
+        #Returns the gravitational acceleration of every body with a single query, without reading the rest of their data.
+        with self.lock:
+            return dict(self.connection.execute("SELECT name, acceleration FROM bodies ORDER BY position").fetchall())
+
+    def body(self, name):
+        #The data of a body is only read the first time it is needed.
+        if name not in self.bodies:
+            with self.lock:
+                row = self.connection.execute("SELECT name, photos, acceleration, header, physical_title, physical, physical_size, orbital_title, orbital, orbital_size FROM bodies WHERE name = ?", (name,)).fetchone()
+            if row is None:
+                raise KeyError(name)
+            photos = json.loads(row[1])
+            self.bodies[name] = {"name": row[0], "photos": photos, "images": len(photos), "acceleration": row[2], "header": row[3],
+                "physical_title": row[4], "physical": row[5], "physical_size": json.loads(row[6]),
+                "orbital_title": row[7], "orbital": row[8], "orbital_size": json.loads(row[9])}
+        return self.bodies[name]
+
+    def composition(self, name):
+        #Returns the compounds of the atmosphere of the body with their percentages, in the order of the source file.
+        if name not in self.compositions:
+            with self.lock:
+                rows = self.connection.execute("SELECT compound, percentage FROM composition WHERE body = ? ORDER BY position", (name,)).fetchall()
+            self.compositions[name] = dict(rows)
+        return self.compositions[name]
+
+    def close(self):
+        self.connection.close()
+
+store = None    #Store shared by the whole application.
+
+def load_store():
+    #Compiles the database if a source file has changed since the last time, and opens it once.
+    global store
+    if store is None:
+        if not is_current(DATABASE):
+            build(DATABASE)
+        store = BodyStore(DATABASE)
+    return store
+
+def reload_store():
+    #Compiles the database again if a source file has changed and replaces the shared store. Returns the names of the bodies whose data changed.
+    global store
+    old = store
+    if not is_current(DATABASE):
+        build(DATABASE)
+    elif old is not None and old.signature == signature():    #The database may also have been compiled by another process, like the kiosk server.
+        return set()
+    store = BodyStore(DATABASE)
+    if old is None:
+        return set(store.names())
+    changed = set(old.names()) ^ set(store.names())    #Added and removed bodies.
+    old_aliases, aliases = old.aliases(), store.aliases()
+    for name in set(old.names()) & set(store.names()):
+        if old.body(name) != store.body(name) or old.composition(name) != store.composition(name) or old_aliases[name] != aliases[name]:
+            changed.add(name)
+    old.close()
+    return changed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile the data of the bodies into a database.")
+    parser.add_argument("--force", action="store_true", help="compile even if the sources have not changed")
+    args = parser.parse_args(argv)
+    if args.force or not is_current():
+        build()
+        print(f"Compiled {DATABASE}")
+    else:
+        print(f"{DATABASE} is up to date")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import os
+import queue
+import sqlite3
+import itertools
+import threading
+from image_cache import load_resized
+from bodydata import load_store
+from profiling import profiler
+
+POLL_DELAY = 50    #Milliseconds between two checks for bodies finished by the background thread.
+VISIBLE = 0    #Priority of the bodies the user is looking at or about to open. Lower numbers are loaded first.
+BACKGROUND = 1    #Priority of the rest of the catalogue.
+
+def thumbnails(body):
+    #Images read in advance for each body: its header and its first photo, at the size they are displayed.
+    images = [(body["header"], (534, 300))]
+    if body["photos"]:
+        images.append((body["photos"][0], (472, 472)))
+    return images
+
+class CatalogueLoader:
+    def __init__(self, window):
+        #A background thread reads the data of the bodies and prepares their first images in priority order, so the main loop never waits for them.
+        self.window = window
+        self.tasks = queue.PriorityQueue()
+        self.finished = queue.Queue()
+        self.order = itertools.count()    #Keeps the order of the catalogue between bodies with the same priority.
+        self.done = set()    #Bodies already prepared by the thread.
+        self.loaded = set()    #Bodies already received by the main loop.
+        self.names = set()    #Bodies requested since the start.
+        self.thread = None
+        self.polling = False
+
+    def start(self, names):
+        for name in names:
+            self.tasks.put((BACKGROUND, next(self.order), name))
+        self.names.update(names)
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run, daemon=True)
+            self.thread.start()
+        if not self.polling:    #The main loop checks for finished bodies until all of them have been received.
+            self.polling = True
+            self.window.after(POLL_DELAY, self.receive)
+
+    def prioritize(self, *names):
+        #The bodies are placed before the rest of the catalogue. They are added again rather than moved, and the thread skips the copies already done.
+        for name in names:
+            if name not in self.done:
+                self.tasks.put((VISIBLE, next(self.order), name))
+
+    def reload(self, names):
+        #Prepares the given bodies again, for example after their data has changed on disk.
+        current = set(load_store().names())
+        self.names &= current    #Removed bodies are no longer waited for.
+        self.done.difference_update(names)
+        self.loaded.difference_update(names)
+        self.start([name for name in names if name in current])
+
+    def stop(self):
+        self.tasks.put((-1, -1, None))
+
+    def run(self):
+        while True:
+            _, _, name = self.tasks.get()
+            if name is None:
+                return
+            if name in self.done:
+                continue
+            try:
+                try:
+                    self.load(name)
+                except sqlite3.Error:    #The store was closed by a reload while the body was read, so it is read again from the new one.
+                    self.load(name)
+            except (KeyError, OSError, sqlite3.Error):    #Bodies that were removed or whose images cannot be read are skipped.
+                pass
+            self.done.add(name)
+            self.finished.put(name)
+
+    def load(self, name):
+        store = load_store()    #The store is read at each task because it is replaced when the database is reloaded.
+        body = store.body(name)
+        store.composition(name)
+        #The images are written to the cache of resized images, and only the cached copies are read later.
+        for path, size in thumbnails(body):
+            if os.path.exists(path):
+                load_resized(path, size).close()
+
+    def receive(self):
+        while True:
+            try:
+                name = self.finished.get_nowait()
+            except queue.Empty:
+                break
+            self.loaded.add(name)
+        pending = len(self.names - self.loaded)
+        profiler.count("catalogue_pending", pending)
+        if pending:
+            self.window.after(POLL_DELAY, self.receive)
+        else:
+            self.polling = False
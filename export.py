@@ -0,0 +1,204 @@
+import os
+import html
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import bodydata
+from PIL import Image, ImageDraw, ImageFont
+from image_cache import load_resized
+from bodydata import load_store
+from project import calculate_fall_table
+from styles import compound_color
+
+FORMATS = ("png", "pdf", "html")
+WORKERS = os.cpu_count() or 1    #One process for each core of the machine.
+PAGE_WIDTH = 1200
+MARGIN = 40
+HEADER_SIZE = (534, 300)
+PHOTO_SIZE = (236, 236)    #The photos are displayed at half the size of the slideshow, four in each row.
+PHOTOS_PER_ROW = 4
+HEIGHTS = (1, 10, 100, 1000)    #Heights in meters of the fall table.
+BAR_LENGTH = 600
+
+def load_font(size):
+    #Uses a scalable font if one is available, and the small font included in Pillow otherwise.
+    for name in ("DejaVuSans.ttf", "Arial.ttf"):
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            pass
+    try:
+        return ImageFont.load_default(size)
+    except TypeError:    #Versions of Pillow older than 10.1 have a single size.
+        return ImageFont.load_default()
+
+class Page:
+    def __init__(self, image=None):
+        #Without an image, the page is only measured: the texts are drawn on a tiny image and the photos are not read.
+        self.image = image
+        self.draw = ImageDraw.Draw(image if image is not None else Image.new("RGB", (1, 1)))
+        self.fonts = {size: load_font(size) for size in (14, 30)}
+        self.y = MARGIN
+
+    def paste(self, path, size, x):
+        if self.image is not None and os.path.exists(path):
+            with load_resized(path, size) as image:    #Each image is closed once pasted, so only the page stays in memory.
+                self.image.paste(image, (x, self.y))
+
+    def title(self, text, size=30):
+        self.y += 30
+        font = self.fonts[size]
+        width = self.draw.textlength(text, font=font)
+        self.draw.text(((PAGE_WIDTH - width) / 2, self.y), text, fill="black", font=font)
+        self.y += size + 20
+
+    def header(self, path):
+        self.paste(path, HEADER_SIZE, (PAGE_WIDTH - HEADER_SIZE[0]) // 2)
+        self.y += HEADER_SIZE[1]
+
+    def photos(self, paths):
+        left = (PAGE_WIDTH - PHOTOS_PER_ROW * PHOTO_SIZE[0] - (PHOTOS_PER_ROW - 1) * 10) // 2
+        for i, path in enumerate(paths):
+            self.paste(path, PHOTO_SIZE, left + (i % PHOTOS_PER_ROW) * (PHOTO_SIZE[0] + 10))
+            if i % PHOTOS_PER_ROW == PHOTOS_PER_ROW - 1 or i == len(paths) - 1:
+                self.y += PHOTO_SIZE[1] + 10
+
+    def columns(self, left_text, right_text):
+        #The titles and the values are written in two columns whose lines correspond one to one.
+        font = self.fonts[14]
+        self.draw.multiline_text((PAGE_WIDTH / 2 - 260, self.y), left_text, fill="black", font=font, spacing=6)
+        self.draw.multiline_text((PAGE_WIDTH / 2 + 20, self.y), right_text, fill="black", font=font, spacing=6)
+        bottom = max(self.draw.multiline_textbbox((0, self.y), text, font=font, spacing=6)[3] for text in (left_text, right_text))
+        self.y = bottom + 10
+
+    def table(self, rows):
+        font = self.fonts[14]
+        for i, row in enumerate(rows):
+            for j, cell in enumerate(row):
+                self.draw.text((PAGE_WIDTH / 2 - 300 + j * 200, self.y), cell, fill="black" if i else "gray", font=font)
+            self.y += 26
+
+    def bars(self, composition):
+        font = self.fonts[14]
+        for compound, percentage in composition.items():
+            self.draw.text((MARGIN * 3, self.y + 8), compound, fill="black", font=font)
+            left = MARGIN * 3 + 220
+            self.draw.rectangle((left, self.y, left + BAR_LENGTH, self.y + 30), outline="lightgray")
+            self.draw.rectangle((left, self.y, left + BAR_LENGTH * percentage / 100, self.y + 30), fill=compound_color(compound))
+            self.draw.text((left + BAR_LENGTH + 15, self.y + 8), f"{percentage:.4f}%", fill="black", font=font)
+            self.y += 40
+
+def fall_rows(body):
+    times, velocities = calculate_fall_table(HEIGHTS, [body["acceleration"]])
+    return [("Height (m)", "Time (s)", "Velocity (m/s)")] + [(f"{height:g}", f"{time:.2f}", f"{velocity:.2f}") for height, time, velocity in zip(HEIGHTS, times[0], velocities[0])]
+
+def draw_page(page, body, composition):
+    #Draws the same sections as the body view of the application, in the same order.
+    page.header(body["header"])
+    page.title("Photo collection")
+    page.photos(body["photos"])
+    page.title("Physical Data")
+    page.columns(body["physical_title"], body["physical"])
+    page.title("Orbital Data")
+    page.columns(body["orbital_title"], body["orbital"])
+    page.title("Gravitational force")
+    page.table(fall_rows(body))
+    page.title("Atmospheric composition")
+    page.bars(composition)
+    return page.y + MARGIN
+
+def render_page(body, composition):
+    #The page is measured first, so the image has the exact height of its content.
+    height = draw_page(Page(), body, composition)
+    image = Image.new("RGB", (PAGE_WIDTH, height), "white")
+    draw_page(Page(image), body, composition)
+    return image
+
+def html_image(source, size, assets, target):
+    #Saves the image at the size it is displayed and returns the tag that displays it.
+    if not os.path.exists(source):
+        return ""
+    with load_resized(source, size) as image:
+        image.save(os.path.join(assets, target))
+    return f"<img src=\"assets/{html.escape(os.path.basename(assets))}/{html.escape(target)}\" width=\"{size[0]}\" height=\"{size[1]}\">\n"
+
+def write_html(body, composition, directory):
+    #The page is written section by section, and the images are saved next to it at the size they are displayed.
+    assets = os.path.join(directory, "assets", body["name"])
+    os.makedirs(assets, exist_ok=True)
+    path = os.path.join(directory, f"{body['name']}.html")
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(f"<!DOCTYPE html>\n<html>\n<head><meta charset=\"utf-8\"><title>{html.escape(body['name'].capitalize())}</title></head>\n<body style=\"font-family: Times; text-align: center\">\n")
+        file.write(f"<h1>{html.escape(body['name'].capitalize())}</h1>\n")
+        file.write(html_image(body["header"], HEADER_SIZE, assets, "header.png"))
+        file.write("<h2>Photo collection</h2>\n")
+        for source in body["photos"]:
+            file.write(html_image(source, PHOTO_SIZE, assets, os.path.basename(source)))
+        for title, left_text, right_text in (("Physical Data", body["physical_title"], body["physical"]), ("Orbital Data", body["orbital_title"], body["orbital"])):
+            file.write(f"<h2>{title}</h2>\n<table style=\"margin: auto\"><tr><td style=\"white-space: pre; text-align: left\">{html.escape(left_text)}</td><td style=\"white-space: pre; text-align: left\">{html.escape(right_text)}</td></tr></table>\n")
+        file.write("<h2>Gravitational force</h2>\n<table style=\"margin: auto\">\n")
+        header, *rows = fall_rows(body)
+        file.write("<tr>" + "".join(f"<th>{cell}</th>" for cell in header) + "</tr>\n")
+        for row in rows:
+            file.write("<tr>" + "".join(f"<td>{cell}</td>" for cell in row) + "</tr>\n")
+        file.write("</table>\n<h2>Atmospheric composition</h2>\n")
+        for compound, percentage in composition.items():
+            file.write(f"<div style=\"margin: 5px auto; width: {BAR_LENGTH}px; text-align: left\">{html.escape(compound)} {percentage:.4f}%"
+                f"<div style=\"background: {compound_color(compound)}; width: {percentage}%; height: 20px\"></div></div>\n")
+        file.write("</body>\n</html>\n")
+    return path
+
+def start_worker(database):
+    #A SQLite connection must not be used after a fork, so each worker forgets the store inherited from the parent process and opens its own.
+    bodydata.store = None
+    bodydata.DATABASE = database
+    load_store()
+
+def export_body(name, directory, formats=FORMATS):
+    #Runs in a worker process and writes the files of one body at a time.
+    store = load_store()
+    body, composition = store.body(name), store.composition(name)
+    written = []
+    if "png" in formats or "pdf" in formats:
+        with render_page(body, composition) as page:
+            for extension in ("png", "pdf"):
+                if extension in formats:
+                    path = os.path.join(directory, f"{name}.{extension}")
+                    page.save(path, **({"resolution": 96} if extension == "pdf" else {}))
+                    written.append(path)
+    if "html" in formats:
+        written.append(write_html(body, composition, directory))
+    return written
+
+def write_index(names, directory):
+    with open(os.path.join(directory, "index.html"), "w", encoding="utf-8") as file:
+        file.write("<!DOCTYPE html>\n<html>\n<head><meta charset=\"utf-8\"><title>Solar System Encyclopedia</title></head>\n<body>\n<h1>Solar System Encyclopedia</h1>\n<ul>\n")
+        for name in names:
+            file.write(f"<li><a href=\"{html.escape(name)}.html\">{html.escape(name.capitalize())}</a></li>\n")
+        file.write("</ul>\n</body>\n</html>\n")
+
+def export(directory, names=None, formats=FORMATS, workers=WORKERS):
+    #The database is compiled before the workers start, so they all open the same file instead of compiling it at the same time.
+    store = load_store()
+    names = names or store.names()
+    os.makedirs(directory, exist_ok=True)
+    #Each worker renders one body and writes it to disk before taking the next one, so the memory used does not grow with the number of bodies.
+    with ProcessPoolExecutor(max_workers=workers, initializer=start_worker, initargs=(bodydata.DATABASE,)) as executor:
+        for name, written in zip(names, executor.map(export_body, names, [directory] * len(names), [formats] * len(names))):
+            print(f"{name}: {', '.join(written)}")
+    if "html" in formats:
+        write_index(names, directory)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export the pages of the bodies to files, without opening the application.")
+    parser.add_argument("bodies", nargs="*", help="bodies to export (all if none are given)")
+    parser.add_argument("--output", default="export", help="folder where the files are written")
+    parser.add_argument("--format", nargs="+", choices=FORMATS, default=list(FORMATS), help="formats of the exported pages")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="number of processes")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.bodies if name not in load_store().names()]
+    if unknown:    #Unknown names are rejected before starting the workers.
+        parser.error(f"unknown bodies: {', '.join(unknown)}")
+    export(args.output, args.bodies or None, tuple(args.format), args.workers)
+
+if __name__ == "__main__":
+    main()
@@ -1,99 +1,140 @@
 import tkinter as tk
-from tkinter import messagebox
-from PIL import Image, ImageTk
+from tkinter import messagebox, ttk
+import time
 import numpy as np
-from project import calculate_time, calculate_velocity
-
-#Contains for each celestial body its gravitational acceleration.
-bodies = {"mercury": {"coords": (290, 50), "acceleration": 3.7},
-    "venus": {"coords": (290, 50), "acceleration": 8.87},
-    "earth": {"coords": (290, 50), "acceleration": 9.81},
-    "mars": {"coords": (290, 50), "acceleration": 3.73},
-    "jupiter": {"coords": (290, 50), "acceleration": 24.79},
-    "saturn": {"coords": (290, 50), "acceleration": 10.44},
-    "uranus": {"coords": (290, 50), "acceleration": 8.87},
-    "neptune": {"coords": (290, 50), "acceleration": 11.15},
-    "sun": {"coords": (290, 50), "acceleration": 274},
-    "default": {"coords": (110, 50), "acceleration": 9.81}}
-
-def setup_canvas(frame, planet):
-    celestial2 = planet
+from project import calculate_time, calculate_velocity, calculate_fall_table, check_values
+from image_loader import loader, fill
+from animation import animator
+from bodydata import load_store
+
+BALL = "images/headers/ball.png"
+
+def load_bodies():
+    #Fills "bodies" with the gravitational acceleration of each celestial body of the database. It is called again when the database is reloaded.
+    bodies.clear()
+    bodies.update({name: {"coords": (290, 50), "acceleration": acceleration} for name, acceleration in load_store().accelerations().items()})
+    bodies["default"] = {"coords": (110, 50), "acceleration": 9.81}
+
+bodies = {}    #Contains for each celestial body its position on the canvas and its gravitational acceleration.
+load_bodies()
+
+def setup_canvas(frame, panel):
     #Create a light blue canvas where the balls fall.
     canvas = tk.Canvas(frame, width=400, height=400, bg="skyblue")
     canvas.pack()
-    #Creates a button that when clicked calls the "start_falling" function, which starts the balls falling.
-    start_button = tk.Button(frame, text="Start", command=lambda: start_falling(canvas, img, "default", celestial2))
+    #Creates a button that when clicked calls the "start" method of the panel, which starts the balls falling.
+    start_button = tk.Button(frame, text="Start", command=panel.start)
     start_button.pack()
-    #Open the ball image.
-    image = Image.open("images/headers/ball.png")
-    image = image.resize((90, 90), Image.LANCZOS)
-    img = ImageTk.PhotoImage(image)    #Converts the image into a format that can be used in a Tkinter Canvas.
+    #Creates an empty image for the balls. The ball image is resized to 90x90 pixels by the loader workers and copied into it when ready, which updates the balls already on the canvas.
+    img = tk.PhotoImage(width=90, height=90)
+    load_ball(canvas, img)
     return canvas, img
 
-balls = []    #Used to store references to the balls on the canvas.
-def start_falling(canvas, img, celestial1, celestial2):
-    global balls
-    if balls:
-        for ball in balls:
-            canvas.delete(ball)    #Removes balls from the canvas.
-    for body in bodies.values():
-        body["velocity"] = 0    #Resets the velocity of all balls to 0.
-
-    #Obtains the data of the two bodies to simulate.
-    body1 = bodies[celestial1]
-    body2 = bodies[celestial2]
-    #Creates the images on the canvas at the coordinates obtained with the image of the ball.
-    ball1 = canvas.create_image(*body1["coords"], image=img, anchor=tk.CENTER)
-    ball2 = canvas.create_image(*body2["coords"], image=img, anchor=tk.CENTER)
-    balls.extend([ball1, ball2])    #Add the two created balls to the balls list.
-
-    fall(canvas, ball1, celestial1, ball2, celestial2)
-
-def fall(canvas, ball1, celestial1, ball2, celestial2):
-    coords1, coords2 = canvas.coords(ball1), canvas.coords(ball2)    #Gets the current coordinates of ball1 and ball2 on the canvas.
-    #Check if any of the balls coordinates are not available to prevent errors if the coordinates do not exist.
-    if not coords1 or not coords2:
-        return None    #If the coordinates of any of the balls are not found, the function ends.
-
-    y1, y2 = coords1[1], coords2[1]    #Assign the y-coordinate of ball1 and ball2 to the variables y1 and y2 respectively.
-    body1, body2 = bodies[celestial1], bodies[celestial2]    #Access data on the two celestial bodies.
-
-    #Check if the y coordinate of the ball is less than 350, if yes, the ball keeps falling.
-    if y1 < 350:
-        #Calculates the balls new velocity using the gravitational acceleration of its respective celestial body.
-        #The value 0.05 is the time that has passed between each update.
-        body1["velocity"] += body1["acceleration"] * 0.05
-        #Move the ball on the canvas along the y-axis according to its calculated velocity. The value 0 means that it does not move on the x-axis.
-        canvas.move(ball1, 0, body1["velocity"])
-
-    if y2 < 350:
-        body2["velocity"] += body2["acceleration"] * 0.05
-        canvas.move(ball2, 0, body2["velocity"])
-
-    #Check if any of the balls have speed. If at least one of the balls is moving the simulation continues.
-    if body1["velocity"] or body2["velocity"]:
-        canvas.after(50, fall, canvas, ball1, celestial1, ball2, celestial2)
-
-def create_calculator(frame, planet, calc_type):
-    body = bodies[planet]
+def load_ball(canvas, img):
+    loader.load(canvas, BALL, (90, 90), lambda photo: fill(img, photo))
 
-    def calculate():
+PIXELS_PER_METER = 20    #Scale of the simulation, which keeps the speed of the previous version where the balls moved in steps of 0.05 s.
+GROUND = 350    #y coordinate where the balls stop falling.
+
+class Simulation:
+    def __init__(self, canvas, img):
+        self.canvas = canvas    #Each canvas has its own simulation, so several canvases can run at the same time without interfering.
+        self.img = img
+        self.balls = []    #Saves for each ball its canvas item, its x and starting y coordinates, its acceleration and the time it takes to land.
+
+    def start(self, *celestials, started=None):
+        #"started" is the time when the balls were released. If it is given, the simulation continues from that moment instead of starting again.
+        for ball in self.balls:
+            self.canvas.delete(ball[0])    #Removes balls from the canvas.
+        self.balls = []
+        for celestial, x in zip(celestials, self.positions(celestials)):
+            y = bodies[celestial]["coords"][1]
+            acceleration = bodies[celestial]["acceleration"]
+            #The landing time is obtained with the free fall equations from the height in metres between the ball and the ground.
+            landing = calculate_time((GROUND - y) / PIXELS_PER_METER, acceleration)
+            #Creates the image on the canvas at the coordinates obtained with the image of the ball.
+            ball = self.canvas.create_image(x, y, image=self.img, anchor=tk.CENTER)
+            self.balls.append((ball, x, y, acceleration, landing))
+        #The shared animator moves the balls of every running simulation with a single timer.
+        animator.start(self, self.canvas, self.step, "fall_step", started=started, duration=max((landing for *_, landing in self.balls), default=0))
+        if started is not None:    #The balls are placed at their current position without waiting for the next frame.
+            self.step(time.perf_counter() - started)
+
+    def positions(self, celestials):
+        #The balls are placed at the x coordinate of their body. If two balls would overlap, they are spread evenly across the canvas.
+        xs = [bodies[celestial]["coords"][0] for celestial in celestials]
+        if len(set(xs)) < len(xs):
+            width = int(self.canvas["width"])
+            xs = [width * (2 * i + 1) / (2 * len(celestials)) for i in range(len(celestials))]
+        return xs
+
+    def step(self, elapsed):
+        for ball, x, y, acceleration, landing in self.balls:
+            #The position is calculated from the time elapsed since the start (y = y0 + a * t² / 2), so delays of the timer do not change the result.
+            t = min(elapsed, landing)
+            self.canvas.coords(ball, x, y + acceleration * t ** 2 / 2 * PIXELS_PER_METER)
+        #The simulation continues while any ball has not landed.
+        return any(elapsed < landing for *_, landing in self.balls)
+
+def start_falling(canvas, img, *celestials):
+    #Starts the fall of one ball for each given celestial body on the canvas.
+    if not hasattr(canvas, "simulation"):
+        canvas.simulation = Simulation(canvas, img)
+    canvas.simulation.start(*celestials)
+
+def fall_table(heights):
+    #Calculates the fall times and final velocities of every celestial body (without the default one) for all the heights at once.
+    names = [name for name in bodies if name != "default"]
+    accelerations = [bodies[name]["acceleration"] for name in names]
+    times, velocities = calculate_fall_table(heights, accelerations)
+    return names, times, velocities
+
+def show_comparison(frame, height):
+    names, times, velocities = fall_table([height])
+    #Creates a window with a table that compares the fall from the same height on all the celestial bodies.
+    window = tk.Toplevel(frame, bg="white")
+    window.title("Comparison")
+    window.transient(frame.winfo_toplevel())
+    tk.Label(window, text=f"Fall from {height:g} m", bg="white", font=("Arial", 12)).pack(pady=10)
+    table = ttk.Treeview(window, columns=("body", "time", "velocity"), show="headings", height=len(names))
+    for column, title in (("body", "Celestial body"), ("time", "Time (s)"), ("velocity", "Velocity (m/s)")):
+        table.heading(column, text=title)
+        table.column(column, anchor="center", width=140)
+    for name, fall_time, velocity in zip(names, times[:, 0], velocities[:, 0]):
+        table.insert("", tk.END, values=(name.capitalize(), f"{fall_time:.2f}", f"{velocity:.2f}"))
+    table.pack(padx=10)
+    tk.Button(window, text="Close", command=window.destroy, bg="lightblue", font=("Arial", 10)).pack(pady=10)
+    window.lift()
+
+def create_calculator(frame, panel, calc_type):
+    def read_height():
+        height = entry.get()    #Gets the value entered by the user in the input field.
+        if height == "":    #If the user has not entered any value, send an error message.
+            messagebox.showerror("Error", "Please enter a numeric value.")
+            return None
         try:
-            height = entry.get()    #Gets the value entered by the user in the input field.
-            if height == "":    #If the user has not entered any value, send an error message.
-                messagebox.showerror("Error", "Please enter a numeric value.")
-            else:
-                height = float(height)
-                #Checks if the requested calculation type is "time". If so, the decay time is calculated.
-                if calc_type == "time":
-                    result = calculate_time(height, body["acceleration"])    #Displays the result of the time calculation.
-                    result_label.config(text=f"Time: {result:.2f} s", fg="black")
-                else:
-                    result = calculate_velocity(height, body["acceleration"])    #Displays the result of the velocity calculation.
-                    result_label.config(text=f"Velocity: {result:.2f} m/s", fg="black")
+            return check_values(float(height), "height")[0]    #Negative and non-finite heights are rejected like non-numeric ones.
         except ValueError:
-            #If the value entered is not a numeric value, send an error message.
+            #If the value entered is not a valid numeric value, send an error message.
             messagebox.showerror("Error", "Invalid Input. Please enter a valid numeric value.")
+            return None
+
+    def calculate():
+        height = read_height()
+        if height is not None:
+            body = bodies[panel.planet]    #The calculation uses the body currently displayed by the panel.
+            #Checks if the requested calculation type is "time". If so, the decay time is calculated.
+            if calc_type == "time":
+                result = calculate_time(height, body["acceleration"])    #Displays the result of the time calculation.
+                result_label.config(text=f"Time: {result:.2f} s", fg="black")
+            else:
+                result = calculate_velocity(height, body["acceleration"])    #Displays the result of the velocity calculation.
+                result_label.config(text=f"Velocity: {result:.2f} m/s", fg="black")
+
+    def compare():
+        height = read_height()
+        if height is not None:    #Displays the fall from the entered height on all the celestial bodies.
+            show_comparison(frame, height)
 
     frame = tk.Frame(frame, bg="white")
     frame.pack(expand=True, fill="both", pady=10)
@@ -106,18 +147,74 @@ def create_calculator(frame, planet, calc_type):
     entry.grid(row=1, column=1, pady=5, sticky="w")
     #Creates a button that when clicked calls the "calculate" function, which starts the calculations.
     button = tk.Button(frame, text="Calculate", command=calculate, bg="lightblue", font=("Arial", 10)).grid(row=1, column=1, pady=5, padx=100, sticky="w")
+    #Creates a button that when clicked calls the "compare" function, which compares the fall on all the celestial bodies.
+    tk.Button(frame, text="Compare all", command=compare, bg="lightblue", font=("Arial", 10)).grid(row=1, column=2, pady=5, sticky="w")
     #Create an empty label where the result of the calculation will be displayed.
     result_label = tk.Label(frame, text="", bg="white", font=("Arial", 12))
     result_label.grid(row=2, column=0, columnspan=3, pady=10)
     #Set the frame columns to expand into the available space.
     frame.grid_columnconfigure(0, weight=1)
     frame.grid_columnconfigure(1, weight=1)
+    return entry, result_label
+
+def create_race(frame, panel):
+    #Creates a list where the user chooses several bodies, and a button that drops one ball for each of them on the canvas at the same time.
+    frame = tk.Frame(frame, bg="white")
+    frame.pack(pady=10)
+    tk.Label(frame, text="Race between bodies:", bg="white", font=("Arial", 12)).grid(row=0, column=0, columnspan=2, pady=5)
+    choices = tk.Listbox(frame, selectmode=tk.MULTIPLE, height=6, exportselection=False, font=("Arial", 11))
+    choices.grid(row=1, column=0)
+    scrollbar = tk.Scrollbar(frame, orient="vertical", command=choices.yview)
+    scrollbar.grid(row=1, column=1, sticky="ns")
+    choices.config(yscrollcommand=scrollbar.set)
+    tk.Button(frame, text="Race", command=panel.race, bg="lightblue", font=("Arial", 10)).grid(row=2, column=0, columnspan=2, pady=5)
+    return choices
+
+class GravityPanel:
+    def __init__(self, frame):
+        #The widgets are created once and shared by all the bodies. Each body only keeps the time when its balls were released and the texts of its calculators.
+        self.planet = None
+        self.state = None
+        self.canvas, img = setup_canvas(frame, self)
+        self.simulation = Simulation(self.canvas, img)
+        self.canvas.simulation = self.simulation    #"start_falling" uses the same simulation for races on this canvas.
+        self.race_choices = create_race(frame, self)
+        self.calculators = {calc_type: create_calculator(frame, self, calc_type) for calc_type in ("time", "velocity")}
+
+    def bind(self, planet, state):
+        self.planet, self.state = planet, state
+        #The list of the race is filled again, because the bodies may have changed since the last time.
+        names = [name for name in bodies if name != "default"]
+        if list(self.race_choices.get(0, tk.END)) != [name.capitalize() for name in names]:
+            self.race_choices.delete(0, tk.END)
+            for name in names:
+                self.race_choices.insert(tk.END, name.capitalize())
+        #Restores the height entered and the result obtained in each calculator of the body.
+        for calc_type, (entry, result_label) in self.calculators.items():
+            height, result = state.calculators.get(calc_type, ("", ""))
+            entry.delete(0, tk.END)
+            entry.insert(0, height)
+            result_label.config(text=result)
+        if state.fall_start is None:    #The balls start falling the first time the body is displayed.
+            state.fall_start = time.perf_counter()
+        self.simulation.start("default", planet, started=state.fall_start)
+
+    def save(self):
+        #Saves the texts of the calculators in the state of the body before the panel displays another one.
+        if self.state is not None:
+            self.state.calculators = {calc_type: (entry.get(), result_label.cget("text")) for calc_type, (entry, result_label) in self.calculators.items()}
+
+    def reload_ball(self):
+        #Loads the ball image again after it has changed on disk. The balls already on the canvas are updated with it.
+        load_ball(self.canvas, self.simulation.img)
 
-def create_calculators(frame, planet):
-    create_calculator(frame, planet, "time")
-    create_calculator(frame, planet, "velocity")
+    def race(self):
+        selected = [self.race_choices.get(i).lower() for i in self.race_choices.curselection()]
+        if len(selected) < 2:
+            messagebox.showerror("Error", "Please choose at least two celestial bodies.")
+            return
+        start_falling(self.canvas, self.simulation.img, *selected)
 
-def fall_planet(frame, planet):
-    canvas, img = setup_canvas(frame, planet)
-    start_falling(canvas, img, "default", planet)
-    create_calculators(frame, planet)
+    def start(self):
+        self.state.fall_start = time.perf_counter()
+        self.simulation.start("default", self.planet, started=self.state.fall_start)
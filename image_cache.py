@@ -0,0 +1,99 @@
+import os
+import glob
+import shutil
+import hashlib
+import argparse
+from PIL import Image
+from profiling import profiler
+from atlas import load_atlas
+
+CACHE_DIR = ".cache/images"    #Folder where the resized copies of the images are saved.
+
+def source_key(path):
+    #Every source image has its own folder in the cache, named after the hash of its absolute path.
+    return hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()
+
+def cache_path(path, size, resample=Image.LANCZOS):
+    stat = os.stat(path)
+    #The name of the cached file depends on the modification time of the source, the target size and the resample filter, so a changed source never reuses an old copy.
+    key = f"{stat.st_mtime_ns}-{stat.st_size}-{size[0]}x{size[1]}-{int(resample)}"
+    name = hashlib.sha1(key.encode("utf-8")).hexdigest()
+    return os.path.join(CACHE_DIR, source_key(path), f"{name}.png")
+
+def load_resized(path, size, resample=Image.LANCZOS):
+    #The atlas, when it has been packed, has the pixels already decoded at the size the images are displayed.
+    packed = load_atlas() if resample == Image.LANCZOS else None
+    if packed is not None:
+        with profiler.span("atlas_read", path=path):
+            image = packed.get(path, size)
+        if image is not None:
+            return image
+    cached = cache_path(path, size, resample)
+    if os.path.exists(cached):
+        try:
+            with profiler.span("image_cache_read", path=path):
+                image = Image.open(cached)
+                image.load()    #Reads the pixels now so the file is closed before returning.
+            return image
+        except OSError:    #A damaged cache file is ignored and written again below.
+            pass
+    with profiler.span("image_resize", path=path):
+        image = Image.open(path).resize(size, resample)    #Resizes the original image only when there is no cached copy.
+        save_resized(image, cached)
+    return image
+
+def save_resized(image, cached):
+    os.makedirs(os.path.dirname(cached), exist_ok=True)
+    temporary = f"{cached}.{os.getpid()}.tmp"
+    try:
+        #A low compression level makes the cached copies fast to read. The file is written under another name and then renamed, so other processes never read a partial file.
+        image.save(temporary, format="PNG", compress_level=1)
+        os.replace(temporary, cached)
+    except OSError:    #If the cache cannot be written, the resized image is still used.
+        if os.path.exists(temporary):
+            os.remove(temporary)
+
+def invalidate(paths=None):
+    #Deletes the cached copies of the given source images, or the whole cache if no image is given.
+    if paths is None:
+        shutil.rmtree(CACHE_DIR, ignore_errors=True)
+        return
+    for path in paths:
+        shutil.rmtree(os.path.join(CACHE_DIR, source_key(path)), ignore_errors=True)
+
+def application_images(screen_width=None):
+    #Returns the images used by the application together with the size they are displayed at.
+    images = []
+    for path in sorted(glob.glob("images/*_photos/*.png")):
+        images.append((path, (472, 472)))
+    for path in sorted(glob.glob("images/headers/*_header.png")):
+        images.append((path, (534, 300)))
+    images.append(("images/headers/ball.png", (90, 90)))
+    if screen_width:    #The home page image depends on the width of the screen.
+        images.append(("images/headers/homepage_image.png", (screen_width, round((screen_width * 1638) / 2560))))
+    return images
+
+def warm(screen_width=None):
+    count = 0
+    for path, size in application_images(screen_width):
+        if os.path.exists(path):
+            load_resized(path, size)
+            count += 1
+    return count
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the cache of resized images.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    warm_parser = commands.add_parser("warm", help="resize every image of the application and save it in the cache")
+    warm_parser.add_argument("--screen-width", type=int, help="also cache the home page image for this screen width")
+    invalidate_parser = commands.add_parser("invalidate", help="delete cached images")
+    invalidate_parser.add_argument("paths", nargs="*", help="source images to invalidate (all if none are given)")
+    args = parser.parse_args(argv)
+
+    if args.command == "warm":
+        print(f"{warm(args.screen_width)} images cached in {CACHE_DIR}")
+    else:
+        invalidate(args.paths or None)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import os
+import sys
+import queue
+import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from PIL import ImageTk
+from image_cache import load_resized
+from profiling import profiler
+
+WORKERS = os.cpu_count() or 1    #One worker for each core of the machine.
+POLL_DELAY = 20    #Milliseconds between two checks for images finished by the workers.
+
+class ImageLoader:
+    def __init__(self, workers=WORKERS, processes=False):
+        #Pillow releases the GIL while decoding and resizing, so threads already use several cores. Processes can be used instead if that is not enough.
+        if processes:
+            self.executor = ProcessPoolExecutor(max_workers=workers)
+        else:
+            self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.finished = queue.Queue()    #Images finished by the workers, waiting to be converted in the main loop.
+        self.pending = 0
+        self.placeholders = {}
+
+    def load(self, widget, path, size, callback):
+        #The image is read and resized by a worker. When it is ready, the main loop converts it to a Tkinter image and calls "callback" with it, or with None if it could not be loaded.
+        future = self.executor.submit(load_resized, path, size)
+        future.add_done_callback(lambda done: self.finished.put((done, path, callback)))
+        self.pending += 1
+        if self.pending == 1:    #The main loop starts checking for finished images when the first one is requested.
+            window = widget.winfo_toplevel()    #The checks are scheduled on the main window, which lives as long as the application.
+            window.after(POLL_DELAY, self.receive, window)
+
+    def receive(self, window):
+        try:
+            while True:
+                try:
+                    done, path, callback = self.finished.get_nowait()
+                except queue.Empty:
+                    break
+                self.pending -= 1
+                try:
+                    #Tkinter objects can only be created in the main loop, so the conversion happens here and not in the workers.
+                    with profiler.span("photo_image", path=path):
+                        photo = ImageTk.PhotoImage(done.result()) if done.exception() is None else None
+                    callback(photo)
+                except Exception:    #A failing image is reported, and the other ones are still delivered.
+                    window.report_callback_exception(*sys.exc_info())
+        finally:
+            profiler.count("images_pending", self.pending)
+            if self.pending:
+                window.after(POLL_DELAY, self.receive, window)
+
+    def placeholder(self, width, height):
+        #Returns an empty image of the given size, displayed until the real image is ready. Only one is created for each size.
+        if (width, height) not in self.placeholders:
+            self.placeholders[(width, height)] = tk.PhotoImage(width=width, height=height)
+        return self.placeholders[(width, height)]
+
+loader = ImageLoader()    #Loader shared by the whole application.
+
+def fill(target, photo):
+    #Copies a loaded image into an image that is already displayed, so every widget and canvas item that uses it is updated.
+    if photo is not None:
+        target.tk.call(target, "copy", photo)
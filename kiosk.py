@@ -0,0 +1,217 @@
+import os
+import sys
+import json
+import time
+import queue
+import signal
+import socket
+import argparse
+import threading
+import subprocess
+import traceback
+import socketserver
+import atlas
+import bodydata
+import image_cache
+from bodydata import SOURCES, SOURCE_ERRORS, load_store, reload_store
+from watcher import snapshot, keep_sources, WATCH_INTERVAL
+
+SOCKET = ".cache/kiosk.sock"    #Unix socket where the asset server waits for the instances of the application.
+CONNECT_TIMEOUT = 60    #Seconds to wait for a new server to prepare the assets.
+POLL_DELAY = 200    #Milliseconds between two checks for messages of the server in the main loop.
+
+class KioskServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path=SOCKET, screen_width=None):
+        #The database and the atlas are prepared once here. The instances map the same files, so the operating system keeps a single copy in memory.
+        self.screen_width = screen_width
+        if running(path):
+            raise OSError(f"An asset server is already running on {path}.")
+        self.subscribers = []    #Files where the messages are written to each connected instance.
+        self.lock = threading.Lock()
+        load_store()
+        atlas.pack(image_cache.application_images(screen_width))
+        self.files = snapshot()
+        self.error = None    #Last error of the texts, so it is only reported once while they stay broken.
+        if os.path.exists(path) and not running(path):    #A socket left by a server that did not exit cleanly.
+            os.remove(path)
+        super().__init__(path, KioskHandler)
+
+    def assets(self, texts=False, images=()):
+        #Message sent to the instances: where the assets are, and what has changed since the previous message.
+        return {"database": os.path.abspath(bodydata.DATABASE), "atlas": os.path.abspath(atlas.ATLAS), "cache": os.path.abspath(image_cache.CACHE_DIR),
+            "texts": texts, "images": sorted(images)}
+
+    def subscribe(self, file):
+        with self.lock:
+            self.subscribers.append(file)
+            self.send(file, self.assets())
+
+    def unsubscribe(self, file):
+        with self.lock:
+            if file in self.subscribers:
+                self.subscribers.remove(file)
+
+    def send(self, file, message):
+        try:
+            file.write((json.dumps(message) + "\n").encode("utf-8"))
+            file.flush()
+        except OSError:    #The instance has been closed.
+            self.subscribers.remove(file)
+
+    def broadcast(self, message):
+        with self.lock:
+            for file in list(self.subscribers):
+                self.send(file, message)
+
+    def watch(self):
+        #Checks the sources like the "--watch" mode, but prepares the changes once for every instance.
+        while True:
+            time.sleep(WATCH_INTERVAL / 1000)
+            try:
+                self.check()
+            except Exception:    #The thread keeps watching after an error, so the instances are updated again once the files are fixed.
+                traceback.print_exc()
+
+    def check(self):
+        files = snapshot()
+        previous, self.files = self.files, files
+        changed = {path for path in files.keys() | previous.keys() if files.get(path) != previous.get(path)}
+        if not changed:
+            return
+        images = changed - set(SOURCES.values())
+        texts = bool(changed & set(SOURCES.values()) or any(path not in files or path not in previous for path in images))
+        if texts:
+            try:
+                reload_store()
+                self.error = None
+            except SOURCE_ERRORS as error:    #The instances keep the last data that could be compiled, and the texts are compiled again at the next check.
+                if str(error) != self.error:
+                    print(f"The texts could not be reloaded: {error}", file=sys.stderr)
+                self.error = str(error)
+                keep_sources(self.files, previous)
+                texts = False
+        if images:    #The atlas is written under another name and renamed, so the instances can keep using the old one until they are told.
+            atlas.pack(image_cache.application_images(self.screen_width))
+        if texts or images:
+            self.broadcast(self.assets(texts, images))
+
+class KioskHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        #Each instance keeps its connection open. The server sends it the assets when it connects, and a message every time they change.
+        self.server.subscribe(self.wfile)
+        try:
+            self.rfile.read()    #Returns when the instance closes the connection.
+        except OSError:    #Also when the connection is reset, like the check of "running" that closes it without reading.
+            pass
+        finally:
+            self.server.unsubscribe(self.wfile)
+
+def running(path):
+    #Checks whether a server accepts connections on the socket, rather than only whether the file exists.
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        try:
+            client.connect(path)
+            return True
+        except OSError:
+            return False
+
+def serve(path=SOCKET, screen_width=None):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    server = KioskServer(path, screen_width)
+    threading.Thread(target=server.watch, daemon=True).start()
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))    #The socket is also removed when the server is stopped with "kill".
+    print(f"Serving the assets on {path}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        os.remove(path)
+
+def connect(path=SOCKET):
+    #Connects to the server, and starts it first if no server is running.
+    import fcntl    #Only exists on Unix. It is imported here so the module can be read on any system.
+    #Instances launched together take turns with a lock file, so only the first one starts a server and the others wait for it.
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    with open(f"{path}.lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            client.connect(path)
+            return client
+        except OSError:
+            pass
+        subprocess.Popen([sys.executable, os.path.abspath(__file__), "serve", "--socket", path], start_new_session=True, stdout=subprocess.DEVNULL)
+        deadline = time.perf_counter() + CONNECT_TIMEOUT
+        while True:
+            try:
+                client.connect(path)
+                return client
+            except OSError:
+                if time.perf_counter() > deadline:
+                    raise ConnectionError(f"The asset server did not start on {path}.")
+                time.sleep(0.1)
+
+class KioskClient:
+    def __init__(self, path=SOCKET):
+        #Uses the assets prepared by the server instead of preparing them again. It must be created before the window of the application.
+        self.file = connect(path).makefile("rb")
+        self.messages = queue.Queue()
+        self.apply(self.read())
+
+    def read(self):
+        line = self.file.readline()
+        if not line:
+            raise ConnectionError("The asset server has closed the connection.")
+        return json.loads(line)
+
+    def apply(self, message):
+        bodydata.DATABASE = message["database"]
+        image_cache.CACHE_DIR = message["cache"]
+        atlas.ATLAS = message["atlas"]
+        atlas.reset()
+
+    def start(self, ency):
+        #The messages are read by a thread and handled in the main loop, like the images of the loader.
+        self.ency = ency
+        threading.Thread(target=self.listen, daemon=True).start()
+        ency.window.after(POLL_DELAY, self.receive)
+
+    def listen(self):
+        try:
+            while True:
+                self.messages.put(self.read())
+        except (ConnectionError, OSError, ValueError):
+            self.messages.put(None)
+
+    def receive(self):
+        while True:
+            try:
+                message = self.messages.get_nowait()
+            except queue.Empty:
+                break
+            if message is None:    #Without the server the application keeps working with the assets it has, but no longer updates them.
+                print("The asset server has closed the connection.", file=sys.stderr)
+                return
+            self.apply(message)
+            #The changes are displayed with the same methods as the "--watch" mode, but the files have already been prepared by the server.
+            if message["texts"]:
+                self.ency.reload_texts()
+            if message["images"]:
+                self.ency.reload_images(set(message["images"]), prepared=True)
+        self.ency.window.after(POLL_DELAY, self.receive)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prepare the assets once for several instances of the application on the same machine.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve_parser = commands.add_parser("serve", help="prepare the assets and serve them on a Unix socket")
+    serve_parser.add_argument("--socket", default=SOCKET, help="path of the socket")
+    serve_parser.add_argument("--screen-width", type=int, help="also prepare the home page image for this screen width")
+    args = parser.parse_args(argv)
+    serve(args.socket, args.screen_width)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import os
+import json
+import time
+import threading
+import functools
+import contextlib
+import tkinter as tk
+
+ENVIRONMENT_VARIABLE = "SOLAR_PROFILE"    #If set, the profiler is enabled and the trace is written to the file it names.
+DEFAULT_TRACE = "trace.json"
+STALL_INTERVAL = 100    #Milliseconds between two checks of the main loop.
+STALL_THRESHOLD = 0.05    #A check that arrives more than 50 ms late is recorded as a stall of the main loop.
+OVERLAY_DELAY = 500    #Milliseconds between two refreshes of the overlay.
+
+class Profiler:
+    def __init__(self):
+        self.enabled = False
+        self.path = None
+        self.origin = time.perf_counter()
+        self.events = []    #Events in the Chrome trace format, which can also be opened with speedscope.
+        self.stats = {}    #Saves for each name the number of events, the total time and the longest time.
+        self.lock = threading.Lock()    #Images are loaded from worker threads, so the events can be recorded from several threads.
+        self.overlay = None
+
+    def enable(self, path=DEFAULT_TRACE):
+        self.enabled = True
+        self.path = path
+
+    def record(self, name, start, seconds, **args):
+        event = {"name": name, "ph": "X", "ts": (start - self.origin) * 1e6, "dur": seconds * 1e6, "pid": os.getpid(), "tid": threading.get_ident(), "args": args}
+        with self.lock:
+            self.events.append(event)
+            count, total, longest = self.stats.get(name, (0, 0.0, 0.0))
+            self.stats[name] = (count + 1, total + seconds, max(longest, seconds))
+
+    def span(self, name, **args):
+        #Measures the time of the code inside a "with" block. When the profiler is disabled it does nothing.
+        if not self.enabled:
+            return contextlib.nullcontext()
+        return self.timed(name, args)
+
+    @contextlib.contextmanager
+    def timed(self, name, args):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter() - start, **args)
+
+    def profiled(self, name):
+        #Decorator that measures every call of a function or method.
+        def decorator(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                with self.span(name):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def count(self, name, value):
+        #Records the value of a counter, displayed as a graph in the trace viewers.
+        if self.enabled:
+            with self.lock:
+                self.events.append({"name": name, "ph": "C", "ts": (time.perf_counter() - self.origin) * 1e6, "pid": os.getpid(), "args": {name: value}})
+
+    def watch_stalls(self, window, expected=None):
+        #Schedules a check every STALL_INTERVAL milliseconds. If it runs late, the main loop was blocked during that time.
+        now = time.perf_counter()
+        if expected is not None and now - expected > STALL_THRESHOLD:
+            self.record("event_loop_stall", expected, now - expected)
+        window.after(STALL_INTERVAL, self.watch_stalls, window, time.perf_counter() + STALL_INTERVAL / 1000)
+
+    def attach(self, window):
+        #Starts watching the main loop and binds F12 to show or hide the overlay with the statistics.
+        if self.enabled:
+            self.watch_stalls(window)
+            window.bind("<F12>", lambda event: self.toggle_overlay(window))
+
+    def toggle_overlay(self, window):
+        if self.overlay is not None:
+            self.overlay.destroy()
+            self.overlay = None
+            return
+        self.overlay = tk.Label(window, justify="left", anchor="nw", font=("Courier", 10), bg="black", fg="lime")
+        self.overlay.place(relx=1.0, x=-5, y=5, anchor="ne")
+        self.refresh_overlay()
+
+    def refresh_overlay(self):
+        if self.overlay is None or not self.overlay.winfo_exists():
+            return
+        lines = [f"{'name':24} {'count':>6} {'mean ms':>8} {'max ms':>8}"]
+        with self.lock:
+            stats = sorted(self.stats.items(), key=lambda item: -item[1][1])    #The names with the most total time are displayed first.
+        for name, (count, total, longest) in stats[:15]:
+            lines.append(f"{name[:24]:24} {count:6} {total / count * 1000:8.2f} {longest * 1000:8.2f}")
+        self.overlay.config(text="\n".join(lines))
+        self.overlay.lift()
+        self.overlay.after(OVERLAY_DELAY, self.refresh_overlay)
+
+    def dump(self, path=None):
+        path = path or self.path
+        if not self.enabled or not path:
+            return
+        with self.lock:
+            trace = {"traceEvents": list(self.events), "displayTimeUnit": "ms"}
+        with open(path, "w") as file:
+            json.dump(trace, file)
+
+profiler = Profiler()    #Profiler shared by the whole application.
+if os.environ.get(ENVIRONMENT_VARIABLE):
+    profiler.enable(os.environ[ENVIRONMENT_VARIABLE])
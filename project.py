@@ -1,29 +1,73 @@
+import sys
+import socket
+import argparse
 import tkinter as tk
-from PIL import Image, ImageTk
+from PIL import ImageTk
 import numpy as np
-from slideshow import celestial_slide
-from bars import setup_celestial
+from slideshow import Slideshow, photo_cache
+from bars import BarPanel
+from image_cache import load_resized, invalidate
+from image_loader import loader
+from bodydata import load_store, reload_store
+from search import SearchIndex
+from watcher import AssetWatcher
+from scrolling import SmoothScroller
+from catalogue import CatalogueLoader
+from styles import registry, THEMES
+from profiling import profiler, DEFAULT_TRACE
 
-def main():
-    main_window = tk.Tk()
+HOMEPAGE_IMAGE = "images/headers/homepage_image.png"
+
+def main(argv=()):
+    parser = argparse.ArgumentParser(description="Solar System Encyclopedia")
+    #With "--profile" the timings of the application are recorded, displayed with F12 and written to a trace file when it closes. The SOLAR_PROFILE environment variable does the same.
+    parser.add_argument("--profile", nargs="?", const=DEFAULT_TRACE, metavar="TRACE", help="record timings and write them to a Chrome trace file")
+    #With "--watch" the texts and images are checked while the application runs, and the changes are displayed without restarting it.
+    parser.add_argument("--watch", action="store_true", help="reload the texts and images when they change")
+    parser.add_argument("--theme", choices=THEMES, default="default", help="colors of the interface")
+    #With "--kiosk" the assets are prepared once by a shared server process (started if needed) for all the instances on the machine, which are updated together when the assets change.
+    parser.add_argument("--kiosk", nargs="?", const=True, metavar="SOCKET", help="use the assets of the shared asset server")
+    parser.add_argument("--display", help="X display where the window is opened, such as :0.1")
+    args = parser.parse_args(list(argv))
+    if args.profile:
+        profiler.enable(args.profile)
+    kiosk = None
+    if args.kiosk:
+        #The kiosk mode is only imported when it is used, because it needs the Unix sockets and file locks that Windows does not have.
+        if not hasattr(socket, "AF_UNIX"):
+            parser.error("--kiosk needs Unix sockets, which are not available on this system")
+        from kiosk import KioskClient
+        kiosk = KioskClient() if args.kiosk is True else KioskClient(args.kiosk)
+
+    main_window = tk.Tk(screenName=args.display)
     ency = SolarSystem(main_window)    #Creates an instance of the "SolarSystem" class which is the main class that manages the interface and functionality.
+    profiler.attach(main_window)
+    registry.use_theme(args.theme, main_window)    #The colors of the widgets already created are changed in a single pass.
+    if kiosk is not None:
+        kiosk.start(ency)
+    elif args.watch:    #In kiosk mode the server already watches the assets.
+        AssetWatcher(ency).start()
     screen_width = main_window.winfo_screenwidth()    #Gets the system screen dimensions with "winfo_screenwidth()" and "winfo_screenheight()".
     screen_height = main_window.winfo_screenheight()
     main_window.mainloop()    #Launches the main loop that keeps the window open and functional.
+    profiler.dump()    #Writes the trace file if the profiler is enabled.
     return screen_width, screen_height
 
 ####Below are the 3 required functions used to perform the tests using pytest.
 def check_celestial(ency):
-    entered_text = ency.celestial_entry.get().strip().lower()    #Gets the text entered by the user, converts it to lowercase and removes extra spaces.
-    #Associate the names of the bodies with numerical indices.
-    celestials = {"mercury": 0, "venus": 1, "earth": 2, "mars": 3, "jupiter": 4, "saturn": 5, "uranus": 6, "neptune": 7, "sun": 8}
-    if entered_text == "moon":    #If the entered text is "moon", it displays an informative message indicating that the Moon is not available.
+    entered_text = ency.celestial_entry.get()
+    ency.hide_suggestions()
+    #The search index finds the body by its name or by one of its aliases, ignoring case, accents and extra spaces.
+    name = ency.search_index.resolve(entered_text)
+    if name is not None:
+        index = ency.store.index(name)    #If the text matches a body, the corresponding index is obtained and the "manage_frames" function is called.
+        ency.manage_frames(ency.window.winfo_screenwidth(), ency.window.winfo_screenheight(), index=index)
+    elif entered_text.strip().lower() == "moon":    #If the entered text is "moon" and it has not been added to the database, it displays an informative message indicating that the Moon is not available.
         tk.messagebox.showinfo("Info", "The moon is not available yet.")
-    elif entered_text in celestials:
-        index = celestials.get(entered_text)    #If the text matches a body, the corresponding index is obtained and the "manage_frames" function is called.
-        ency.manage_frames(ency.window.winfo_screenwidth(), ency.window.winfo_screenheight(), show_frame=ency.celestial_frame[index])
-    else:    #If the entered text is not a valid name of a body, an error message is displayed.
-        tk.messagebox.showerror("Error", "The entered celestial body is not valid. Please enter a valid celestial body.")
+    else:    #If the entered text is not a valid name of a body, an error message is displayed with the closest body, if there is one.
+        matches = ency.search_index.search(entered_text, 1)
+        hint = f" Did you mean {matches[0].capitalize()}?" if matches else ""
+        tk.messagebox.showerror("Error", f"The entered celestial body is not valid. Please enter a valid celestial body.{hint}")
 
 def calculate_time(height, acceleration):    #This function calculates the time of an object in free fall from a height.
     return np.sqrt(2 * height / acceleration)
@@ -31,86 +75,158 @@ def calculate_time(height, acceleration):    #This function calculates the time
 def calculate_velocity(height, acceleration):    #This function calculates the final velocity of an object in free fall from a height.
     return np.sqrt(2 * acceleration * height)
 
+def check_values(values, name, allow_zero=True):
+    #Converts the values into a one-dimensional array and checks that they are finite and not negative (or strictly positive if "allow_zero" is False).
+    values = np.atleast_1d(np.asarray(values, dtype=float))
+    if values.ndim != 1:
+        raise ValueError(f"The {name} must be a single value or a list of values.")
+    if not np.all(np.isfinite(values)):
+        raise ValueError(f"The {name} must be finite numbers.")
+    if np.any(values < 0) or (not allow_zero and np.any(values == 0)):
+        raise ValueError(f"The {name} must be {'non-negative' if allow_zero else 'positive'} numbers.")
+    return values
+
+def calculate_fall_table(heights, accelerations):
+    #Calculates the fall time and the final velocity for every combination of acceleration and height in a single operation.
+    heights = check_values(heights, "heights")
+    accelerations = check_values(accelerations, "accelerations", allow_zero=False)
+    #The accelerations are placed in a column and the heights in a row, so NumPy broadcasts them into a matrix of bodies x heights.
+    times = calculate_time(heights[np.newaxis, :], accelerations[:, np.newaxis])
+    velocities = calculate_velocity(heights[np.newaxis, :], accelerations[:, np.newaxis])
+    return times, velocities
+
+class BodyState:
+    def __init__(self, name):
+        #Saves what the user did on a body, so it can be restored when the body view displays it again.
+        self.name = name
+        self.current_image_index = [0]    #Index of the image displayed by the slideshow.
+        self.scroll = 0.0    #Position of the scrollbar, as a fraction of the height of the page.
+        self.fall_start = None    #Time when the balls were released.
+        self.bars_start = None    #Time when "Run" was clicked on the composition bars.
+        self.calculators = {}    #Height entered and result obtained in each calculator.
+
 class SolarSystem:
-    def __init__(self, window):
+    def __init__(self, window, lazy=True, prefetch=True):
         self.window = window
         self.window.overrideredirect(True)    #Hides standard window borders and controls.
         screen_width = self.window.winfo_screenwidth()    #Adjust the graphical interface to any resolution.
         screen_height = self.window.winfo_screenheight()
         self.window.geometry(f"{screen_width}x{screen_height}")    #Sets the size of the main window to fill the entire screen.
+        #With "lazy" the body view is only built the first time a body is shown, and with "prefetch" it is built while the application is idle.
+        self.lazy = lazy
+        self.prefetch = prefetch
 
-        #Call the "load_texts" method to read and process data related to the physical and orbital characteristics of the bodies.
-        self.data_physical, self.data_orbital = self.load_texts()
+        #Opens the database with the data of the bodies, which is compiled from the text files only when they change. Each body is read when it is displayed.
+        self.store = load_store()
+        self.states = {}    #State of each body that has been displayed.
+        self.current = None    #Index of the body displayed by the body view.
+        #The data and first images of every body are prepared in the background while the home page is displayed.
+        self.catalogue = CatalogueLoader(self.window)
         self.setup_homepage(screen_width, screen_height)  # Call the "setup_homepage" method to create the initial interface elements for the main window.
-        self.manage_frames(screen_width, screen_height)    #Call the "manage_frames" method to create the frames containing the bodies.
+        self.manage_frames(screen_width, screen_height)    #Call the "manage_frames" method to create the frame of the body view.
+        if self.prefetch:
+            self.catalogue.start(self.store.names())
+    @profiler.profiled("setup_frames")
     def setup_frames(self, screen_width, screen_height):
-        physical_data = self.data_physical    #The data_physical and data_orbital lists are extracted from the class attributes.
-        orbital_data = self.data_orbital
-        #Paths of the header images of the bodies and the sun.
-        headers = ["images/headers/mercury_header.png", "images/headers/venus_header.png", "images/headers/earth_header.png", "images/headers/mars_header.png", "images/headers/jupiter_header.png", "images/headers/saturn_header.png", "images/headers/uranus_header.png", "images/headers/neptune_header.png", "images/headers/sun_header.png"]
-        self.images = []
-        for title in headers:    #Open and resize the images to a fixed size of 534x300 pixels.
-            img = Image.open(title).resize((534, 300), Image.LANCZOS)
-            self.images.append(img)
-        self.r_images = []
-        for image in self.images:    #Resized images are converted to PhotoImage objects, which tkinter can display.
-            r_image = ImageTk.PhotoImage(image)
-            self.r_images.append(r_image)
-        self.labels = []
-        for scro, image in zip(self.celestial_scroller, self.r_images):    #Labels are created for each image and assigned to the scrollable containers.
-            label = tk.Label(scro, image=image, bg="white")
-            self.labels.append(label)
-        for label in self.labels:
-            label.pack(anchor="nw", padx=screen_width // 2 - 267)    #Adjust the horizontal margin to center the images in the window.
-
-        #Calls the specific methods of the bodies.
-        self.slideshow(screen_width, screen_height)
-        self.information("Physical Data", physical_data)
-        self.information("Orbital Data", orbital_data)
-        self.gravity(screen_width, screen_height)
-        self.atmospheric_composition(screen_width, screen_height)
-
-    def manage_frames(self, screen_width, screen_height, show_frame=None):
-        #The class instance is checked to see if it already has the "celestial_frame" attribute. If it does not exist, the frames have not yet been created and they are created.
-        if not hasattr(self, "celestial_frame"):
-            self.celestial_frame = []    #Three empty lists are created to store the frames, canvases and scrollers.
-            self.celestial_canvas = []
-            self.celestial_scroller = []
-
-            for i in range(9):    #Creating frames, canvas and scrollers.
-                frame = tk.Frame(self.window)
-                canvas = tk.Canvas(frame)
-                scroller = tk.Frame(canvas, bg="white")
-                self.celestial_frame.append(frame)
-                self.celestial_canvas.append(canvas)
-                self.celestial_scroller.append(scroller)
-                #When the scroller is resized, "<Configure>" updates the scrollable region of the canvas based on the size of the content.
-                scroller.bind("<Configure>", lambda e: canvas.configure(scrollregion=canvas.bbox("all")))
-                canvas.create_window((0, 0), window=scroller, anchor="nw")    #The scroller is placed inside the canvas.
-                canvas.pack(fill="both", expand=True)    #"fill=both" takes up all the available space, and "expand=True" expands to the size of the frame.
-
-                exit_button = tk.Button(canvas, text="Exit", command=self.close_window)    #An "Exit" button is created on each canvas that closes the program.
-                exit_button.place(x=screen_width - 35, y=screen_height - 35)
-                #A "Back" button is created on each canvas to return to the main screen.
-                back_button = tk.Button(canvas, text=" 🡰 ", command=lambda: self.manage_frames(screen_width, screen_height, self.homepage_frame))
-                back_button.place(x=5, y=5)
-
-            self.setup_frames(screen_width, screen_height)
+        #A single body view is built and displays one body at a time, instead of building the same widgets for every body.
+        if hasattr(self, "header_label"):
+            return
+        #A label is created for the header image. It displays an empty image of the same size until the header is loaded.
+        self.header_label = tk.Label(self.body_scroller, image=loader.placeholder(534, 300), bg="white")
+        self.header_label.pack(anchor="nw", padx=screen_width // 2 - 267)    #Adjust the horizontal margin to center the image in the window.
+
+        #Calls the specific methods that build each part of the view.
+        self.slides = self.setup_functions("Photo collection", Slideshow)
+        self.physical_texts = self.information("Physical Data")
+        self.orbital_texts = self.information("Orbital Data")
+        self.gravity_panel = self.gravity()
+        self.bar_panel = self.setup_functions("Atmospheric composition", BarPanel)
+        self.scroller.listen(self.slides.reveal)
+        registry.apply(self.body_scroller)    #The body view takes the theme chosen when the application was started.
+
+    def bind_body(self, index):
+        #Displays the data and the state of the body in the body view.
+        self.setup_frames(self.window.winfo_screenwidth(), self.window.winfo_screenheight())
+        if self.current is not None:    #The state of the body displayed until now is saved.
+            self.save_body()
+        self.current = index
+        name = self.store.names()[index]
+        state = self.states.setdefault(name, BodyState(name))
+        body = self.store.body(name)
+
+        self.show_header(body["header"])
+        self.slides.bind(body["photos"], state.current_image_index)
+        physical_data, orbital_data = self.load_texts(index)    #Call the "load_texts" method to read the data related to the physical and orbital characteristics of the body.
+        self.fill_information(self.physical_texts, physical_data)
+        self.fill_information(self.orbital_texts, orbital_data)
+        self.gravity_panel.bind(name, state)
+        self.bar_panel.bind(name, state)
+
+        #Once the widgets have their new size, the page returns to the position where the user left it.
+        self.window.update_idletasks()
+        self.scroller.jump(state.scroll)
+
+    def save_body(self):
+        state = self.states[self.store.names()[self.current]]
+        state.scroll = self.body_canvas.yview()[0]
+        self.gravity_panel.save()
+
+    def show_header(self, path):
+        self.header_label.path = path
+        photo = photo_cache.get(path)    #Headers share the memory budget of the slideshow images.
+        if photo is not None:
+            self.header_label.config(image=photo)
+            self.header_label.image = photo    #The label keeps a reference to its image, even if it is removed from the cache.
+            return
+        self.header_label.config(image=loader.placeholder(534, 300))
+        #The image is opened and resized to a fixed size of 534x300 pixels by the loader workers, and converted to a PhotoImage object, which tkinter can display.
+        loader.load(self.header_label, path, (534, 300), lambda photo: self.receive_header(path, photo))
+
+    def receive_header(self, path, photo):
+        if photo is not None:
+            photo_cache.put(path, photo)
+            if self.header_label.path == path:    #The loaded header replaces the empty image if its body is still displayed.
+                self.header_label.config(image=photo)
+                self.header_label.image = photo
+
+    def prefetch_frames(self, screen_width, screen_height):
+        #Builds the body view while the application is idle, so the first body is displayed without waiting.
+        self.setup_frames(screen_width, screen_height)
+
+    @profiler.profiled("manage_frames")
+    def manage_frames(self, screen_width, screen_height, show_frame=None, index=None):
+        #The class instance is checked to see if it already has the "body_frame" attribute. If it does not exist, the frame has not yet been created and it is created.
+        if not hasattr(self, "body_frame"):
+            #The frame, canvas and scroller of the body view.
+            self.body_frame = tk.Frame(self.window)
+            self.body_canvas = tk.Canvas(self.body_frame)
+            self.body_scroller = tk.Frame(self.body_canvas, bg="white")
+            #The scroller follows the mouse wheel and the touchpad smoothly, and updates the scrollable region of the canvas when the content is resized.
+            self.scroller = SmoothScroller(self.body_canvas, self.body_scroller)
+            self.body_canvas.create_window((0, 0), window=self.body_scroller, anchor="nw")    #The scroller is placed inside the canvas.
+            self.body_canvas.pack(fill="both", expand=True)    #"fill=both" takes up all the available space, and "expand=True" expands to the size of the frame.
 
+            exit_button = tk.Button(self.body_canvas, text="Exit", command=self.close_window)    #An "Exit" button is created on the canvas that closes the program.
+            exit_button.place(x=screen_width - 35, y=screen_height - 35)
+            #A "Back" button is created on the canvas to return to the main screen.
+            back_button = tk.Button(self.body_canvas, text=" 🡰 ", command=lambda: self.manage_frames(screen_width, screen_height, self.homepage_frame))
+            back_button.place(x=5, y=5)
+
+            if not self.lazy:    #Without the lazy mode, the body view is built before the home page appears.
+                self.setup_frames(screen_width, screen_height)
+            elif self.prefetch:    #Otherwise it is built in the background once the home page is idle.
+                self.window.after_idle(self.prefetch_frames, screen_width, screen_height)
+
+        if index is not None:    #If a body is given, the body view displays it.
+            show_frame = self.body_frame
         if show_frame:    #If a frame to display is given, all frames are first hidden with "pack_forget()".
-            frames = [self.homepage_frame, *self.celestial_frame]
-            for f in frames:
+            if show_frame is not self.body_frame and self.current is not None:    #The state of the body is saved when the user leaves it.
+                self.save_body()
+            for f in (self.homepage_frame, self.body_frame):
                 f.pack_forget()
             show_frame.pack(fill="both", expand=True)    #Then the indicated frame is displayed.
-            if show_frame in self.celestial_frame:    #If the "show_frame" corresponds to one of the body frames, its index is obtained and the corresponding canvas is accessed.
-                index = self.celestial_frame.index(show_frame)
-                canvas = self.celestial_canvas[index]
-            else:
-                canvas = None
-
-            if canvas:
-                canvas.bind_all("<MouseWheel>", lambda event: self.mouse_roller(event, canvas))    #The mouse wheel event is linked to allow scrolling within the canvas.
-                canvas.configure(scrollregion=canvas.bbox("all"))    #Gets the bounds of the content within the canvas.
+            if index is not None:
+                self.bind_body(index)
 
     def setup_homepage(self, screen_width, screen_height):
         self.homepage_frame = tk.Canvas(self.window, width=screen_width, height=screen_height)    #A canvas is created that serves as the basis for the home screen.
@@ -121,18 +237,30 @@ class SolarSystem:
         #Creates a button that, when clicked, calls the "check_celestial" function, which verifies the entered text.
         self.check_button = tk.Button(self.window, text=" 🡲 ", command=lambda: check_celestial(self))
         self.check_button.place(x=screen_width / 2 + 80, y=screen_height / 2)
+        #While the user types, a list below the entry suggests the bodies that best match the text, even with typos.
+        self.search_index = SearchIndex.from_store(self.store)
+        self.suggestions = tk.Listbox(self.homepage_frame, font=("Arial", 14), width=13, height=0, activestyle="none")
+        self.suggestion_position = (screen_width / 2 - 60, screen_height / 2 + 32)
+        self.celestial_entry.bind("<KeyRelease>", self.suggest)
+        self.celestial_entry.bind("<Return>", lambda event: check_celestial(self))
+        self.celestial_entry.bind("<Down>", self.focus_suggestions)
+        self.celestial_entry.bind("<Escape>", lambda event: self.hide_suggestions())
+        self.suggestions.bind("<ButtonRelease-1>", self.choose_suggestion)
+        self.suggestions.bind("<Return>", self.choose_suggestion)
+        self.suggestions.bind("<Escape>", lambda event: (self.hide_suggestions(), self.celestial_entry.focus_set()))
 
-        image = Image.open("images/headers/homepage_image.png")    #Home screen background image.
-        #Resizes the image to fit the width of the screen, keeping the original aspect ratio.
-        r_image = image.resize((screen_width, round((screen_width * 1638) / 2560)), Image.LANCZOS)
-        self.bg_image = ImageTk.PhotoImage(r_image)    #Converts image to Tkinter compatible object.
-        self.homepage_frame.create_image(0, 0, anchor="nw", image=self.bg_image)    #Draw the background image on the home screen.
+        #Home screen background image. Resizes the image to fit the width of the screen, keeping the original aspect ratio.
+        #It is loaded directly because it is the first thing the user sees.
+        r_image = load_resized(HOMEPAGE_IMAGE, (screen_width, round((screen_width * 1638) / 2560)))
+        with profiler.span("photo_image", path=HOMEPAGE_IMAGE):
+            self.bg_image = ImageTk.PhotoImage(r_image)    #Converts image to Tkinter compatible object.
+        self.bg_item = self.homepage_frame.create_image(0, 0, anchor="nw", image=self.bg_image)    #Draw the background image on the home screen.
 
         #Create a button that, when clicked, displays a message box with instructions.
         self.help_button = tk.Button(self.window, text="   ?   ", bg="lightblue", command=lambda: tk.messagebox.showinfo(
                 "Help",
                 "Instructions:\n\n"
-                "1. Enter the name of a celestial body in the input field. Valid options: Mercury, Venus, Earth, Mars, Jupiter, Saturn, Uranus, Neptune, Sun.\n"
+                "1. Enter the name of a celestial body in the input field, or choose one of the suggestions displayed while typing.\n"
                 """2. Click the "🡲" button to confirm your choice.\n"""
                 """4. The "Exit" button will close the application."""))
         self.help_button.place(x=5, y=5)
@@ -140,103 +268,137 @@ class SolarSystem:
         self.exit_button = tk.Button(self.window, text="Exit", command=self.close_window)
         self.exit_button.place(x=screen_width - 35, y=screen_height - 35)
 
-    def load_texts(self):
-        #The file "characteristics.txt" is opened in read mode with the option "encoding=utf-8" to handle special characters and mathematical symbols.
-        with open("texts/characteristics.txt", "r", encoding="utf-8") as file:
-            lines = file.readlines()
-
-        data = {}    #Saves the categories and their respective information.
-        title = None    #Saves the name of the data category (physical_body_name, orbital_body_name).
-        texts_list = []    #Saves the lines related to that category.
-
-        def sentences():
-            if title and texts_list:
-                # If the title starts with "physical" or "orbital", then the lines of "texts_list" are joined with newlines and saved in data.
-                if title.startswith(("physical", "orbital")):
-                    data[title] = "\n".join(texts_list)
-                else:    #If title does not start with "physical" or "orbital", save "texts_list" directly to data.
-                    data[title] = texts_list
-
-        for line in lines:
-            line = line.strip()
-            if line.endswith(":"):    #If the line ends with ":", call "sentences()" to save the previous category.
-                sentences()
-                title = line[:-1]    #Update title with the current line, removing the ":".
-                texts_list = []    #Reset "texts_list" to start accumulating new lines for this category.
-            elif line:
-                texts_list.append(line.replace("\\n", "\n"))    #If the line is not empty, replace "\n" with a real newline and add the line to "texts_list".
-        sentences()
-        #Create a dictionary with the title and its respective physical information, as well as the dimensions for the interface.
-        physical_data = []
-        for body in ["mercury", "venus", "earth", "mars", "jupiter", "saturn", "uranus", "neptune"]:
-            physical_data.append({ "title": "\n".join(data["phy_title"]), "information": data[f"physical_{body}"], "left_width": 14, "left_height": 16, "right_width": 20, "right_height": 16})
-        physical_data.append({"title": "\n".join(data["phy_sun_title"]), "information": data["physical_sun"], "left_width": 14, "left_height": 21, "right_width": 22, "right_height": 21})
-        #Create a dictionary with the title and its respective orbital information, as well as the dimensions for the interface.
-        orbital_data = []
-        for body in ["mercury", "venus", "earth", "mars", "jupiter", "saturn", "uranus", "neptune"]:
-            orbital_data.append({"title": "\n".join(data["orb_title"]), "information": data[f"orbital_{body}"], "left_width": 14, "left_height": 5, "right_width": 20, "right_height": 5})
-        orbital_data.append({"title": "\n".join(data["orb_sun_title"]), "information": data["orbital_sun"], "left_width": 18, "left_height": 8, "right_width": 22, "right_height": 8})
+    def suggest(self, event):
+        if event.keysym in ("Return", "Down", "Up", "Escape"):    #Keys used to move through the list do not change the suggestions.
+            return
+        matches = self.search_index.search(self.celestial_entry.get())
+        self.suggestions.delete(0, tk.END)
+        if not matches:
+            self.hide_suggestions()
+            return
+        self.catalogue.prioritize(*matches)    #The suggested bodies are the ones the user is most likely to open next.
+        for name in matches:
+            self.suggestions.insert(tk.END, name.capitalize())
+        self.suggestions.config(height=len(matches))
+        x, y = self.suggestion_position
+        self.suggestions.place(x=x, y=y)
 
-        return physical_data, orbital_data
+    def hide_suggestions(self):
+        self.suggestions.place_forget()
 
-    def information(self, title, data):
-        for i, (scro, setting) in enumerate(zip(self.celestial_scroller, data)):
-            tk.Label(scro, text=title, fg="black", bg="white", font=("Times", 30)).pack(pady=(50, 0))    #Create a label with the category title.
-            #Creates a frame that will serve as a container for the text boxes.
-            frame = tk.Frame(scro, bg="white")
-            frame.pack(pady=10, anchor="center")
-            #Creates a text box that has a width and height defined by the values in the "setting" dictionary.
-            left_text = tk.Text(frame, width=setting["left_width"], height=setting["left_height"], borderwidth=0, highlightthickness=0, font=("Times", 14))
-            left_text.insert("1.0", setting["title"])    #Inserts the title text.
-            left_text.config(state=tk.DISABLED)    #Sets the text box so that the user cannot edit the content.
-            left_text.grid(row=0, column=0, padx=10)    #Place the text box in the first column.
-            #Creates a text box that has a width and height defined by the values in the "setting" dictionary.
-            right_text = tk.Text(frame, width=setting["right_width"], height=setting["right_height"], borderwidth=0, highlightthickness=0, font=("Times", 14))
-            right_text.insert("1.0", setting["information"])    #Inserts the text of the information.
-            right_text.config(state=tk.DISABLED)    #Sets the text box so that the user cannot edit the content.
-            right_text.grid(row=0, column=1, padx=10)    #Place the text box in the second column.
-
-    def setup_functions(self, title, action, action_args):    #Receives the title displayed in the interface, the function to be executed, and the list of arguments.
-        for scro in self.celestial_scroller:
-            #Creates the title of the different functions displayed in the interface.
-            tk.Label(scro, text=title, fg="black", bg="white", font=("Times", 30)).pack(pady=(50, 0))
-
-        for scro, args in zip(self.celestial_scroller, action_args):    #Each function is passed the scrollable container and the unpacked arguments.
-            action(scro, *args)
-
-    def slideshow(self, screen_width, screen_height):
-        #Contains the names of the bodies and the number of images associated with each body.
-        celestials = {"mercury": 8, "venus": 6, "earth": 8, "mars": 7, "jupiter": 8, "saturn": 7, "uranus": 6, "neptune": 6, "sun": 7}
-        action_args = []
-        for body, num_images in celestials.items():    #For each body add a tuple of the name and the number of images.
-            action_args.append((body, num_images))
-        self.setup_functions("Photo collection", celestial_slide, action_args)
-
-    def gravity(self, screen_width, screen_height):
-        from gravity import fall_planet    #The function is imported here due to a circular import.
-        celestials = ["mercury", "venus", "earth", "mars", "jupiter", "saturn", "uranus", "neptune", "sun"]
-        action_args = []
-        for body in celestials:
-            #For each body, add a tuple with a single element (the name) to send the contents as a single argument.
-            action_args.append((body,))
-        self.setup_functions("Gravitational force", fall_planet, action_args)
-
-    def atmospheric_composition(self, screen_width, screen_height):
-        celestials = ["mercury", "venus", "earth", "mars", "jupiter", "saturn", "uranus", "neptune", "sun"]
-        action_args = []
-        for body in celestials:
-            #For each body, add a tuple with a single element (the name) to send the contents as a single argument.
-            action_args.append((body,))
-        self.setup_functions("Atmospheric composition", setup_celestial, action_args)
-
-    def mouse_roller(self, event, canvas):
-        if event.delta > 0:    #The mouse event triggers the function.
-            canvas.yview_scroll(-1, "units")    #If the mouse wheel scroll is positive, scroll the canvas up
+    def focus_suggestions(self, event):
+        #The down arrow moves from the entry to the first suggestion.
+        if self.suggestions.winfo_ismapped():
+            self.suggestions.focus_set()
+            self.suggestions.selection_clear(0, tk.END)
+            self.suggestions.selection_set(0)
+            self.suggestions.activate(0)
+
+    def choose_suggestion(self, event):
+        selection = self.suggestions.curselection()
+        if selection:    #The chosen body is written in the entry and displayed.
+            self.celestial_entry.delete(0, tk.END)
+            self.celestial_entry.insert(0, self.suggestions.get(selection[0]).lower())
+            check_celestial(self)
+
+    def reload_texts(self):
+        #Compiles the database again and displays the new data of the body view only if its body has changed.
+        from gravity import load_bodies    #The function is imported here due to a circular import.
+        if self.current is not None:    #The state is saved while the indices still correspond to the old database.
+            self.save_body()
+            current = self.store.names()[self.current]
         else:
-            canvas.yview_scroll(1, "units")    #If negative, scroll the canvas down.
+            current = None
+        changed = reload_store()
+        if not changed:
+            return
+        self.store = load_store()
+        self.search_index = SearchIndex.from_store(self.store)
+        load_bodies()
+        self.catalogue.reload(changed)
+        if current is None:
+            return
+        if current not in self.store.names():    #If the displayed body has been removed, the home page is displayed.
+            self.current = None
+            if self.body_frame.winfo_ismapped():
+                self.manage_frames(self.window.winfo_screenwidth(), self.window.winfo_screenheight(), self.homepage_frame)
+        elif current in changed:    #The body view is updated in place, keeping the position and the state of the body.
+            self.current = None
+            self.bind_body(self.store.index(current))
+        else:    #The position of the body in the database may have changed.
+            self.current = self.store.index(current)
+
+    def reload_images(self, paths, prepared=False):
+        #Removes the old versions of the changed images and loads again the ones that are displayed.
+        #With "prepared" the cache of resized images has already been updated by the kiosk server, and its new entries are shared by every instance.
+        from gravity import BALL    #The constant is imported here due to a circular import.
+        if not prepared:
+            invalidate(paths)
+        for path in paths:
+            photo_cache.remove(path)
+        if HOMEPAGE_IMAGE in paths:
+            size = (self.bg_image.width(), self.bg_image.height())
+            loader.load(self.homepage_frame, HOMEPAGE_IMAGE, size, self.receive_homepage)
+        if not hasattr(self, "header_label"):    #The body view has not been built yet.
+            return
+        if getattr(self.header_label, "path", None) in paths:
+            self.show_header(self.header_label.path)
+        if paths & set(self.slides.images):    #The current image and its neighbours are loaded again.
+            self.slides.refresh()
+        if BALL in paths:
+            self.gravity_panel.reload_ball()
+
+    def receive_homepage(self, photo):
+        if photo is not None:
+            self.bg_image = photo
+            self.homepage_frame.itemconfigure(self.bg_item, image=photo)
+
+    def load_texts(self, index):
+        #Reads the physical and orbital texts of the body from the database, as well as the dimensions for the interface.
+        body = self.store.body(self.store.names()[index])
+        physical_data, orbital_data = {"title": body["physical_title"], "information": body["physical"]}, {"title": body["orbital_title"], "information": body["orbital"]}
+        for data, size in ((physical_data, body["physical_size"]), (orbital_data, body["orbital_size"])):
+            data["left_width"], data["left_height"], data["right_width"], data["right_height"] = size
+        return physical_data, orbital_data
+
+    def information(self, title):
+        scro = self.body_scroller
+        tk.Label(scro, text=title, fg="black", bg="white", font=("Times", 30)).pack(pady=(50, 0))    #Create a label with the category title.
+        #Creates a frame that will serve as a container for the text boxes.
+        frame = tk.Frame(scro, bg="white")
+        frame.pack(pady=10, anchor="center")
+        #Creates two text boxes, whose size and content are set for each body by "fill_information".
+        left_text = tk.Text(frame, borderwidth=0, highlightthickness=0, font=("Times", 14))
+        left_text.grid(row=0, column=0, padx=10)    #Place the text box in the first column.
+        right_text = tk.Text(frame, borderwidth=0, highlightthickness=0, font=("Times", 14))
+        right_text.grid(row=0, column=1, padx=10)    #Place the text box in the second column.
+        return left_text, right_text
+
+    def fill_information(self, texts, setting):
+        left_text, right_text = texts
+        #The text boxes take the width and height defined by the values in the "setting" dictionary.
+        left_text.config(state=tk.NORMAL, width=setting["left_width"], height=setting["left_height"])
+        left_text.delete("1.0", tk.END)
+        left_text.insert("1.0", setting["title"])    #Inserts the title text.
+        left_text.config(state=tk.DISABLED)    #Sets the text box so that the user cannot edit the content.
+        right_text.config(state=tk.NORMAL, width=setting["right_width"], height=setting["right_height"])
+        right_text.delete("1.0", tk.END)
+        right_text.insert("1.0", setting["information"])    #Inserts the text of the information.
+        right_text.config(state=tk.DISABLED)    #Sets the text box so that the user cannot edit the content.
+
+    def setup_functions(self, title, action):    #Receives the title displayed in the interface and the class that builds the function.
+        scro = self.body_scroller
+        #Creates the title of the different functions displayed in the interface.
+        tk.Label(scro, text=title, fg="black", bg="white", font=("Times", 30)).pack(pady=(50, 0))
+        return action(scro)    #The class is passed the scrollable container, and the created object is later bound to each body.
+
+    def gravity(self):
+        from gravity import GravityPanel    #The class is imported here due to a circular import.
+        return self.setup_functions("Gravitational force", GravityPanel)
 
     def close_window(self):
+        self.catalogue.stop()
         self.window.quit()    #Calls the "quit()" method, stopping the main loop and closing the graphical interface..
 
 if __name__ == "__main__":
-    main()
+    main(sys.argv[1:])
@@ -0,0 +1,97 @@
+import math
+from animation import animator, viewports
+
+PIXELS_PER_NOTCH = 60    #Pixels scrolled by each notch of the mouse wheel.
+SCROLL_TIME = 0.06    #Seconds the page takes to cover about two thirds of the remaining distance.
+REGION_DELAY = 50    #Milliseconds to wait after a resize of the content before updating the scrollable region.
+
+class SmoothScroller:
+    def __init__(self, canvas, content):
+        #Scrolls "canvas", which displays the frame "content", by pixels. All the wheel events received during a frame are added up and drawn once by the shared animator.
+        self.canvas = canvas
+        self.content = content
+        self.target = 0    #y coordinate of the page that the top of the canvas is moving to.
+        self.last = 0
+        self.region_timer = None
+        self.notify_timer = None
+        self.listeners = []    #Functions called after the page has moved, once the widgets are at their new position.
+        self.system = canvas.tk.call("tk", "windowingsystem")    #"win32", "aqua" or "x11": each one reports the wheel differently.
+        viewports.add(canvas)
+        #The events are received from any widget of the page, but each scroller only handles those inside its own canvas.
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            canvas.bind_all(sequence, self.wheel, add="+")
+        #The size of the page can change many times in a row while it is being filled, so the scrollable region is updated once it has settled.
+        content.bind("<Configure>", lambda event: self.schedule_region())
+
+    def listen(self, callback):
+        self.listeners.append(callback)
+
+    def contains(self, widget):
+        return str(widget).startswith(str(self.canvas)) and self.canvas.winfo_viewable()
+
+    def wheel(self, event):
+        if not self.contains(event.widget):
+            return
+        if self.system == "win32":    #Windows sends multiples of 120 for each notch.
+            notches = event.delta / 120
+        elif self.system == "aqua":    #macOS sends the number of notches, or small values for touchpads.
+            notches = event.delta
+        elif event.num in (4, 5):    #X11 sends buttons 4 and 5 instead of "<MouseWheel>".
+            notches = 1 if event.num == 4 else -1
+        else:
+            return
+        self.scroll_to(self.target - notches * PIXELS_PER_NOTCH)
+
+    def scroll_to(self, y):
+        self.target = min(max(y, 0), self.limit())
+        self.last = 0
+        animator.start(self, self.canvas, self.step, "scroll")
+
+    def step(self, elapsed):
+        #Moves a part of the remaining distance that depends on the time since the previous frame, so the speed is the same at any frame rate.
+        interval, self.last = elapsed - self.last, elapsed
+        top = self.top()
+        distance = self.target - top
+        if abs(distance) < 1:
+            self.move(self.target)
+            return False
+        self.move(top + distance * (1 - math.exp(-interval / SCROLL_TIME)))
+        return True
+
+    def jump(self, fraction):
+        #Moves the page without animation, to a position given as a fraction of its height.
+        animator.stop(self)
+        self.update_region()
+        self.move(fraction * self.height())
+        self.target = self.top()
+
+    def top(self):
+        return self.canvas.canvasy(0)
+
+    def height(self):
+        return max(self.content.winfo_reqheight(), 1)
+
+    def limit(self):
+        return max(self.height() - self.canvas.winfo_height(), 0)
+
+    def move(self, y):
+        self.canvas.yview_moveto(y / self.height())
+        if self.listeners and self.notify_timer is None:
+            self.notify_timer = self.canvas.after_idle(self.notify)
+
+    def notify(self):
+        self.notify_timer = None
+        for callback in self.listeners:
+            callback()
+
+    def schedule_region(self):
+        if self.region_timer is None:
+            self.region_timer = self.canvas.after(REGION_DELAY, self.update_region)
+
+    def update_region(self):
+        #The region is the requested size of the content, which avoids measuring every item of the canvas with "bbox".
+        if self.region_timer is not None:
+            self.canvas.after_cancel(self.region_timer)
+            self.region_timer = None
+        self.canvas.configure(scrollregion=(0, 0, self.content.winfo_reqwidth(), self.height()))
+        self.target = min(self.target, self.limit())
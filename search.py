@@ -0,0 +1,90 @@
+import bisect
+import unicodedata
+
+MAX_RESULTS = 8    #Maximum number of suggestions displayed under the entry.
+MAX_CANDIDATES = 50    #Number of entries, among those sharing the most trigrams with the text, that are compared letter by letter.
+
+def normalize(text):
+    #Converts the text to lowercase, removes accents and extra spaces, so "  Plutón " and "pluton" are the same key.
+    text = unicodedata.normalize("NFKD", text.strip().lower())
+    text = "".join(character for character in text if not unicodedata.combining(character))
+    return " ".join(text.split())
+
+def trigrams(key):
+    #Groups of three consecutive letters. The spaces at the start and the end give more weight to the beginning and the end of the words.
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def distance(first, second, limit):
+    #Number of letters that must be inserted, deleted, replaced or swapped to go from one text to the other. Stops as soon as it exceeds "limit".
+    if abs(len(first) - len(second)) > limit:
+        return limit + 1
+    previous_row, row = None, list(range(len(second) + 1))
+    for i in range(1, len(first) + 1):
+        before, previous_row, row = previous_row, row, [i] + [0] * len(second)
+        for j in range(1, len(second) + 1):
+            cost = first[i - 1] != second[j - 1]
+            row[j] = min(previous_row[j] + 1, row[j - 1] + 1, previous_row[j - 1] + cost)
+            if i > 1 and j > 1 and first[i - 1] == second[j - 2] and first[i - 2] == second[j - 1]:
+                row[j] = min(row[j], before[j - 2] + 1)
+        if min(row) > limit:
+            return limit + 1
+    return row[-1]
+
+class SearchIndex:
+    def __init__(self, entries):
+        #"entries" is a list of (name, aliases). Every name and alias becomes a key that points to the name.
+        self.keys = []
+        self.names = []
+        for name, aliases in entries:
+            for key in {normalize(name), *(normalize(alias) for alias in aliases)}:
+                self.keys.append(key)
+                self.names.append(name)
+        order = sorted(range(len(self.keys)), key=lambda i: self.keys[i])    #Sorted keys allow finding every key that starts with a text with a binary search.
+        self.keys = [self.keys[i] for i in order]
+        self.names = [self.names[i] for i in order]
+        self.exact = {}
+        self.grams = {}    #Saves for each trigram the positions of the keys that contain it.
+        for position, key in enumerate(self.keys):
+            self.exact.setdefault(key, self.names[position])
+            for gram in trigrams(key):
+                self.grams.setdefault(gram, []).append(position)
+
+    @classmethod
+    def from_store(cls, store):
+        return cls(store.aliases().items())
+
+    def resolve(self, text):
+        #Returns the name whose name or alias is exactly the text, or None.
+        return self.exact.get(normalize(text))
+
+    def search(self, text, limit=MAX_RESULTS):
+        query = normalize(text)
+        if not query:
+            return []
+        scores = {}    #Saves for each name its best score. Lower scores are displayed first.
+
+        def add(name, score):
+            if score < scores.get(name, (float("inf"),)):
+                scores[name] = score
+
+        #Keys that start with the text are the best suggestions, shortest first.
+        start = bisect.bisect_left(self.keys, query)
+        end = bisect.bisect_left(self.keys, query + "￿")
+        for position in range(start, end):
+            add(self.names[position], (0 if self.keys[position] == query else 1, len(self.keys[position]), self.keys[position]))
+
+        #Keys with a few different letters are found through the trigrams they share with the text, and then sorted by their distance.
+        if len(scores) < limit:
+            shared = {}
+            for gram in trigrams(query):
+                for position in self.grams.get(gram, ()):
+                    shared[position] = shared.get(position, 0) + 1
+            limit_distance = 1 if len(query) <= 4 else 2
+            for position in sorted(shared, key=shared.get, reverse=True)[:MAX_CANDIDATES]:
+                key = self.keys[position]
+                #The text is compared with the start of the key, so an incomplete word with a typo still finds it.
+                steps = min(distance(query, key, limit_distance), distance(query, key[:len(query)], limit_distance))
+                if steps <= limit_distance:
+                    add(self.names[position], (2 + steps, len(key), key))
+        return [name for name, score in sorted(scores.items(), key=lambda item: item[1])[:limit]]
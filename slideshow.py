@@ -1,47 +1,135 @@
 import tkinter as tk
-from PIL import Image, ImageTk
+from collections import OrderedDict
+from image_cache import load_resized
+from image_loader import loader
+from animation import in_viewport
+
+CACHE_IMAGES = 12    #Maximum number of converted images kept in memory for all the slideshows together.
+CACHE_BYTES = 12 * 472 * 472 * 4    #Memory budget of the cache in bytes (each pixel takes 4 bytes).
+
+class PhotoCache:
+    def __init__(self, max_images=CACHE_IMAGES, max_bytes=CACHE_BYTES):
+        self.max_images = max_images
+        self.max_bytes = max_bytes
+        self.photos = OrderedDict()    #Keeps the images ordered from the least to the most recently used.
+        self.size = 0
+
+    def get(self, key):
+        photo = self.photos.get(key)
+        if photo is not None:
+            self.photos.move_to_end(key)    #The image becomes the most recently used one.
+        return photo
+
+    def put(self, key, photo):
+        if key in self.photos:
+            self.size -= self.cost(self.photos.pop(key))
+        self.photos[key] = photo
+        self.size += self.cost(photo)
+        #The least recently used images are removed until the cache is within its limits again. The newest image is always kept.
+        while len(self.photos) > 1 and (len(self.photos) > self.max_images or self.size > self.max_bytes):
+            _, oldest = self.photos.popitem(last=False)
+            self.size -= self.cost(oldest)
+
+    def remove(self, key):
+        photo = self.photos.pop(key, None)
+        if photo is not None:
+            self.size -= self.cost(photo)
+
+    def cost(self, photo):
+        return photo.width() * photo.height() * 4
+
+photo_cache = PhotoCache()    #A single cache is shared by the slideshows of all the bodies.
+pending = set()    #Images that are being loaded in the background.
 
 def load_image(photo, width, height, directory):
-    image = Image.open(f"{directory}/{photo}" )
-    image = image.resize((width, height), Image.LANCZOS)    #Resize the image to the dimensions of the frame.
+    #Resize the image to the dimensions of the frame. The resized copy is read from the cache when it already exists.
+    image = load_resized(f"{directory}/{photo}", (width, height))
     return image
 
-def update_image(label, images, current_image_index):
-    img = ImageTk.PhotoImage(images[current_image_index[0]])    #Converts image to Tkinter compatible format.
+def request_image(label, path):
+    if path in pending or photo_cache.get(path) is not None:
+        return
+    pending.add(path)
+    #The image is read and resized by the loader workers and converted to a Tkinter image in the main loop.
+    loader.load(label, path, (472, 472), lambda photo: receive_image(label, path, photo))
+
+def receive_image(label, path, photo):
+    pending.discard(path)
+    if photo is None:    #Images that failed to load are requested again the next time they are displayed.
+        return
+    photo_cache.put(path, photo)
+    if label.path == path:    #If the user is still waiting for this image, it replaces the placeholder.
+        show_image(label, photo)
+
+def show_image(label, img):
     label.config(image=img)    #Set the label to display the new image.
-    label.image = img
+    label.image = img    #The label keeps a reference to its image, even if it is removed from the cache.
+
+def update_image(label, images, current_image_index):
+    index = current_image_index[0]
+    label.path = images[index]
+    img = photo_cache.get(label.path)
+    #If the slideshow is scrolled out of view, its images are only loaded when the user scrolls back to it.
+    label.deferred = img is None and not in_viewport(label)
+    if img is not None:
+        show_image(label, img)
+    else:    #An empty image of the same size is displayed until the image has been loaded.
+        show_image(label, loader.placeholder(472, 472))
+        if label.deferred:
+            return
+        request_image(label, label.path)
+    #The previous and the next images are prepared in the background, so the next click displays them without waiting.
+    for neighbour in (index + 1, index - 1):
+        request_image(label, images[neighbour % len(images)])
 
 def change_image(label, images, current_image_index, arrow):
+    if not images:    #Bodies without photos have nothing to move through.
+        return
     #Adjusts the index of the current image by adding or subtracting 1, depending on the direction of the arrow the user clicked.
     current_image_index[0] = (current_image_index[0] + arrow) % len(images)
     #The %len(images) operation causes that if it reaches the end of the list of images, it returns to the beginning, and vice versa
     update_image(label, images, current_image_index)
 
-def create_slideshow(frame, body_name, num_images):
-    directory = f"images/{body_name}_photos"
-    images = []
-    for i in range(1, num_images + 1):
-        #At each iteration, the "load_image" function is called to load an image and resize it to 472x472 pixels.
-        image = load_image(f"Image{i}.png", 472, 472, directory)
-        images.append(image)
-    current_image_index = [0]
-
-    #Create a frame that will contain the slideshow.
-    slide_frame = tk.Frame(frame, bg="white", borderwidth=4, highlightbackground="black", highlightthickness=1)
-    slide_frame.pack(pady=(0, 20))
-    #Create a label inside "slide_frame" to display the images.
-    label = tk.Label(slide_frame, bg="white")
-    label.pack(pady=(0, 5))
-    #Create an additional frame inside slide_frame to hold the "previous" and "next" buttons.
-    button_frame = tk.Frame(slide_frame, bg="white")
-    button_frame.pack(side=tk.BOTTOM, pady=10)
-    #Creates the "previous" button that, when clicked, calls the "change_image" function, which displays the image before the current one.
-    prev_button = tk.Button(button_frame, text="◄", command=lambda: change_image(label, images, current_image_index, -1), bg="white", font=("Times", 25))
-    prev_button.pack(side=tk.LEFT, padx=40)
-    #Creates the "next" button that, when clicked, calls the "change_image" function, which displays the image after the current one.
-    next_button = tk.Button(button_frame, text="►", command=lambda: change_image(label, images, current_image_index, 1), bg="white", font=("Times", 25))
-    next_button.pack(side=tk.RIGHT, padx=40)
+class Slideshow:
+    def __init__(self, frame):
+        #The widgets are created once and shared by all the bodies. Each body only keeps its list of images and its current index.
+        self.images = []
+        self.current_image_index = [0]
 
-    update_image(label, images, current_image_index)
-def celestial_slide(frame, body_name, num_images):
-    create_slideshow(frame, body_name, num_images)
+        #Create a frame that will contain the slideshow.
+        slide_frame = tk.Frame(frame, bg="white", borderwidth=4, highlightbackground="black", highlightthickness=1)
+        slide_frame.pack(pady=(0, 20))
+        #Create a label inside "slide_frame" to display the images.
+        self.label = tk.Label(slide_frame, bg="white")
+        self.label.deferred = False
+        self.label.pack(pady=(0, 5))
+        #Create an additional frame inside slide_frame to hold the "previous" and "next" buttons.
+        button_frame = tk.Frame(slide_frame, bg="white")
+        button_frame.pack(side=tk.BOTTOM, pady=10)
+        #Creates the "previous" button that, when clicked, calls the "change_image" function, which displays the image before the current one.
+        prev_button = tk.Button(button_frame, text="◄", command=lambda: change_image(self.label, self.images, self.current_image_index, -1), bg="white", font=("Times", 25))
+        prev_button.pack(side=tk.LEFT, padx=40)
+        #Creates the "next" button that, when clicked, calls the "change_image" function, which displays the image after the current one.
+        next_button = tk.Button(button_frame, text="►", command=lambda: change_image(self.label, self.images, self.current_image_index, 1), bg="white", font=("Times", 25))
+        next_button.pack(side=tk.RIGHT, padx=40)
+
+    def bind(self, images, current_image_index):
+        #Only the paths of the images are kept. Each image is loaded and resized to 472x472 pixels when it is displayed or about to be displayed.
+        self.images = images
+        self.current_image_index = current_image_index    #The index belongs to the state of the body, so it is preserved when the user comes back.
+        if not images:
+            self.label.path = None
+            show_image(self.label, loader.placeholder(472, 472))
+            return
+        current_image_index[0] %= len(images)    #The number of photos may have changed since the body was last displayed.
+        update_image(self.label, self.images, self.current_image_index)
+
+    def refresh(self):
+        #Displays the current image again, for example after it has been removed from the cache because it changed on disk.
+        if self.images:
+            update_image(self.label, self.images, self.current_image_index)
+
+    def reveal(self):
+        #Loads the images that were skipped while the slideshow was out of view, once it is scrolled into view.
+        if self.label.deferred and in_viewport(self.label):
+            self.refresh()
@@ -0,0 +1,86 @@
+import re
+import colorsys
+import hashlib
+import tkinter as tk
+from tkinter import ttk
+
+#Colors of each theme. "saturation" and "value" set how vivid and bright the colors of the compounds are.
+THEMES = {
+    "default": {"background": "white", "foreground": "black", "trough": "white", "saturation": 0.65, "value": 0.85},
+    "dark": {"background": "#1e1e1e", "foreground": "#e8e8e8", "trough": "#2b2b2b", "saturation": 0.55, "value": 0.95},
+    "high-contrast": {"background": "black", "foreground": "white", "trough": "black", "saturation": 1.0, "value": 1.0},
+}
+BAR_STYLE = "Vertical.TProgressbar"
+
+def compound_color(compound, theme="default"):
+    #The hue is derived from the name of the compound, so a compound has the same color on every body and on every launch.
+    hue = int(hashlib.sha1(compound.encode("utf-8")).hexdigest()[:8], 16) / 0xFFFFFFFF
+    red, green, blue = colorsys.hsv_to_rgb(hue, THEMES[theme]["saturation"], THEMES[theme]["value"])
+    return f"#{round(red * 255):02x}{round(green * 255):02x}{round(blue * 255):02x}"
+
+class StyleRegistry:
+    def __init__(self, theme="default"):
+        self.theme = theme
+        self.style = None    #The ttk style is created with the first bar, once the main window exists.
+        self.bar_styles = {}    #Saves for each compound the name of its style.
+
+    def setup(self):
+        if self.style is None:
+            self.style = ttk.Style()
+            self.style.theme_use("default")    #The theme is chosen once for the whole application.
+            self.configure_bars()
+
+    def bar_style(self, compound):
+        #Returns the style of the bars of the compound, creating it the first time. Bodies with the same compound share the style.
+        self.setup()
+        if compound not in self.bar_styles:
+            name = f"{re.sub(r'[^A-Za-z0-9]', '_', compound)}.{BAR_STYLE}"    #Dots and spaces would split the name of the style.
+            self.bar_styles[compound] = name
+            self.style.configure(name, background=compound_color(compound, self.theme))
+        return self.bar_styles[compound]
+
+    def configure_bars(self):
+        #The options shared by all the bars are set on the parent style, which the style of each compound inherits.
+        colors = THEMES[self.theme]
+        self.style.configure(BAR_STYLE, troughcolor=colors["trough"], thickness=40, bordercolor=colors["background"])
+        for compound, name in self.bar_styles.items():
+            self.style.configure(name, background=compound_color(compound, self.theme))
+
+    def use_theme(self, theme, root=None):
+        #Switches the theme of every bar with one change per style, and recolors the widgets under "root" in a single pass.
+        old = THEMES[self.theme]
+        self.theme = theme
+        if self.style is not None:
+            self.configure_bars()
+        if root is not None:
+            recolor(root, old, THEMES[theme])
+
+    def apply(self, root):
+        #Gives the current theme to widgets that were created with the colors of the default theme.
+        if self.theme != "default":
+            recolor(root, THEMES["default"], THEMES[self.theme])
+
+def same_color(widget, first, second):
+    #Compares the colors by their RGB values, so "black" and "#000000" are the same color.
+    try:
+        return bool(first) and widget.winfo_rgb(first) == widget.winfo_rgb(second)
+    except tk.TclError:
+        return False
+
+def recolor(root, old, new):
+    widgets = [root]
+    while widgets:
+        widget = widgets.pop()
+        widgets.extend(widget.winfo_children())
+        for option, key in (("background", "background"), ("foreground", "foreground")):
+            try:
+                if same_color(widget, str(widget.cget(option)), old[key]):
+                    widget.configure({option: new[key]})
+            except tk.TclError:    #Some widgets, like the ttk ones, do not have these options.
+                pass
+        if widget.winfo_class() == "Canvas":    #Texts drawn on canvases use the color of the text.
+            for item in widget.find_withtag("all"):
+                if widget.type(item) == "text" and same_color(widget, widget.itemcget(item, "fill"), old["foreground"]):
+                    widget.itemconfigure(item, fill=new["foreground"])
+
+registry = StyleRegistry()    #Registry shared by the whole application.
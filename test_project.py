@@ -0,0 +1,310 @@
+import os
+import json
+import shutil
+import numpy as np
+import pytest
+from PIL import Image
+import bodydata
+import atlas
+import image_cache
+from project import calculate_time, calculate_velocity, check_values, calculate_fall_table, check_celestial
+from search import SearchIndex, normalize, distance
+from styles import StyleRegistry, compound_color
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+ENTRIES = [("mercury", []), ("venus", ["morning star"]), ("earth", ["terra", "gaia"]), ("mars", ["red planet"]), ("jupiter", ["jove"]), ("sun", ["sol"])]
+
+@pytest.fixture
+def in_root(monkeypatch):
+    #The application reads its files relative to the folder of the project.
+    monkeypatch.chdir(ROOT)
+
+@pytest.fixture
+def copied_tree(tmp_path, monkeypatch):
+    #A copy of the texts, so the tests can change them without touching the project.
+    shutil.copytree(os.path.join(ROOT, "texts"), tmp_path / "texts")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(bodydata, "store", None)
+    yield tmp_path
+    if bodydata.store is not None:
+        bodydata.store.close()
+
+def test_calculate_time():
+    assert calculate_time(19.62, 9.81) == pytest.approx(2.0)
+    assert calculate_time(0, 3.7) == 0
+
+def test_calculate_velocity():
+    assert calculate_velocity(20, 9.81) == pytest.approx(np.sqrt(2 * 9.81 * 20))
+    assert calculate_velocity(0, 9.81) == 0
+
+def test_check_values():
+    assert list(check_values(5, "height")) == [5.0]
+    with pytest.raises(ValueError):
+        check_values(-1, "height")
+    with pytest.raises(ValueError):
+        check_values(float("nan"), "height")
+    with pytest.raises(ValueError):
+        check_values([0], "accelerations", allow_zero=False)
+
+def test_calculate_fall_table():
+    heights, accelerations = [1, 10, 100], [3.7, 9.81]
+    times, velocities = calculate_fall_table(heights, accelerations)
+    assert times.shape == velocities.shape == (2, 3)
+    for i, acceleration in enumerate(accelerations):
+        for j, height in enumerate(heights):
+            assert times[i, j] == pytest.approx(calculate_time(height, acceleration))
+            assert velocities[i, j] == pytest.approx(calculate_velocity(height, acceleration))
+
+def test_gravity_fall_table(in_root):
+    import gravity
+    names, times, _ = gravity.fall_table([50])
+    assert "default" not in names
+    for name, fall_time in zip(names, times[:, 0]):
+        assert fall_time == pytest.approx(calculate_time(50, gravity.bodies[name]["acceleration"]))
+
+def test_load_store(copied_tree):
+    with open(bodydata.SOURCES["bodies"], encoding="utf-8") as file:
+        bodies = json.load(file)
+    with open(bodydata.SOURCES["composition"], encoding="utf-8") as file:
+        compositions = json.load(file)
+    store = bodydata.load_store()
+    assert bodydata.load_store() is store    #The database is opened once.
+    assert bodydata.is_current()
+    assert store.names() == [body["name"] for body in bodies]
+    assert store.aliases()["earth"] == ["terra", "gaia"]
+    assert store.body("earth")["acceleration"] == 9.81
+    assert list(store.composition("earth").items()) == list(compositions["earth"].items())    #The compounds keep the order of the source file.
+    with pytest.raises(KeyError):
+        store.body("pluto")
+    os.utime(bodydata.SOURCES["characteristics"], ns=(1, 1))
+    assert not bodydata.is_current()    #A changed source compiles the database again.
+
+def test_reload_store(copied_tree):
+    bodydata.load_store()
+    assert bodydata.reload_store() == set()
+    with open("texts/composition_data.txt", encoding="utf-8") as file:
+        text = file.read()
+    with open("texts/composition_data.txt", "w", encoding="utf-8") as file:
+        file.write(text.replace("\"Neon\"", "\"Neon gas\"", 1))
+    os.utime("texts/composition_data.txt", ns=(1, 1))
+    changed = bodydata.reload_store()
+    assert len(changed) == 1
+    assert "Neon gas" in bodydata.load_store().composition(changed.pop())
+
+class FakeTimers:
+    def __init__(self):
+        self.scheduled = 0
+
+    def after(self, delay, callback):
+        self.scheduled += 1
+        return self.scheduled
+
+class FakeApplication:
+    #Has only what "AssetWatcher" uses from "SolarSystem".
+    def __init__(self):
+        self.window = FakeTimers()
+        self.reloads = 0
+
+    def reload_texts(self):
+        self.reloads += 1
+        bodydata.reload_store()
+
+    def reload_images(self, paths):
+        pass
+
+def test_watcher_broken_source(copied_tree, capsys):
+    from watcher import AssetWatcher
+    store = bodydata.load_store()
+    ency = FakeApplication()
+    watcher = AssetWatcher(ency)
+    with open("texts/composition_data.txt", encoding="utf-8") as file:
+        text = file.read()
+    with open("texts/composition_data.txt", "w", encoding="utf-8") as file:
+        file.write(text[:100])    #A file that is being saved.
+    os.utime("texts/composition_data.txt", ns=(1, 1))
+    watcher.poll()
+    watcher.poll()
+    assert ency.window.scheduled == 2    #The watcher keeps checking the files.
+    assert ency.reloads == 2    #The broken texts are compiled again at each check.
+    assert capsys.readouterr().err.count("could not be reloaded") == 1
+    assert bodydata.load_store() is store    #The last data that could be compiled is kept.
+    assert not [name for name in os.listdir(".cache") if name.endswith(".tmp")]
+    with open("texts/composition_data.txt", "w", encoding="utf-8") as file:
+        file.write(text.replace("\"Neon\"", "\"Neon gas\"", 1))
+    os.utime("texts/composition_data.txt", ns=(2, 2))
+    watcher.poll()
+    assert watcher.error is None
+    assert any("Neon gas" in bodydata.load_store().composition(name) for name in bodydata.load_store().names())
+
+def test_build_failure(copied_tree):
+    with open(bodydata.SOURCES["bodies"], encoding="utf-8") as file:
+        bodies = json.load(file)
+    bodies.append(dict(bodies[0], name="pluto"))    #The characteristics of this body are missing.
+    with open(bodydata.SOURCES["bodies"], "w", encoding="utf-8") as file:
+        json.dump(bodies, file)
+    with pytest.raises(KeyError):
+        bodydata.build()
+    assert os.listdir(".cache") == []    #No half written database is left.
+
+def test_atlas_round_trip(tmp_path, monkeypatch):
+    #The atlas and the cache of resized images used to pack it are written in the temporary folder.
+    monkeypatch.setattr(image_cache, "CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(atlas, "ATLAS", str(tmp_path / "images.atlas"))
+    source = tmp_path / "photo.png"
+    Image.new("RGB", (8, 6), (10, 20, 30)).save(source)
+    assert atlas.pack([(str(source), (4, 3)), (str(tmp_path / "missing.png"), (4, 3))]) == 1
+    packed = atlas.Atlas(atlas.ATLAS)
+    image = packed.get(str(source), (4, 3))
+    assert image.mode == "RGBA" and image.size == (4, 3)
+    assert image.getpixel((0, 0)) == (10, 20, 30, 255)
+    assert packed.get(str(source), (8, 6)) is None    #Only the packed size is available.
+    Image.new("RGB", (8, 6), "red").save(source)
+    os.utime(source, ns=(1, 1))
+    assert packed.get(str(source), (4, 3)) is None    #A changed source is no longer read from the atlas.
+    assert sorted(os.listdir(tmp_path)) == ["cache", "images.atlas", "photo.png"]
+
+def save_photo(*names):
+    os.makedirs(os.path.join("images", "earth_photos"), exist_ok=True)
+    for name in names:
+        Image.new("RGB", (4, 4), "blue").save(os.path.join("images", "earth_photos", name))
+
+def test_discover_photos(copied_tree):
+    save_photo("Image1.png", "Image2.png")
+    assert bodydata.load_store().body("earth")["photos"] == ["images/earth_photos/Image1.png", "images/earth_photos/Image2.png"]
+    save_photo("Image10.png")
+    os.utime(os.path.join("images", "earth_photos"), ns=(1, 1))
+    assert bodydata.reload_store() == {"earth"}    #An added photo compiles the database again.
+    assert bodydata.load_store().body("earth")["photos"][-1] == "images/earth_photos/Image10.png"    #Sorted after Image2.
+
+def test_catalogue_loader(copied_tree, monkeypatch):
+    from catalogue import CatalogueLoader
+    closed = bodydata.load_store()
+    closed.close()
+    opened = []
+    def load_store():
+        #The first body is read from a store that a reload has just closed, like "reload_store" does while the thread runs.
+        opened.append(closed if not opened else bodydata.BodyStore())
+        return opened[-1]
+    monkeypatch.setattr("catalogue.load_store", load_store)
+    loader = CatalogueLoader(FakeTimers())
+    loader.tasks.put((0, 0, "earth"))
+    loader.tasks.put((0, 1, "pluto"))    #Removed bodies are skipped.
+    loader.tasks.put((1, 2, None))
+    loader.run()
+    assert [loader.finished.get_nowait() for _ in range(2)] == ["earth", "pluto"]
+    assert loader.done == {"earth", "pluto"}
+    for store in opened[1:]:
+        store.close()
+
+def test_normalize():
+    assert normalize("  Plutón  ") == "pluton"
+    assert normalize("Red   Planet") == "red planet"
+
+def test_distance():
+    assert distance("earth", "earth", 2) == 0
+    assert distance("eatrh", "earth", 2) == 1    #Two swapped letters count as one change.
+    assert distance("xyz", "earth", 2) == 3    #Stops counting above the limit.
+
+def test_resolve():
+    index = SearchIndex(ENTRIES)
+    assert index.resolve("EARTH ") == "earth"
+    assert index.resolve("Terra") == "earth"
+    assert index.resolve("Sól") == "sun"
+    assert index.resolve("eart") is None
+
+def test_search():
+    index = SearchIndex(ENTRIES)
+    assert index.search("ea")[0] == "earth"
+    assert index.search("jupitr") == ["jupiter"]
+    assert index.search("red") == ["mars"]
+    assert index.search("mrs")[0] == "mars"
+    assert index.search("xyz") == []
+    assert index.search("") == []
+
+class FakeEntry:
+    def __init__(self, text):
+        self.text = text
+
+    def get(self):
+        return self.text
+
+class FakeStore:
+    def __init__(self, names):
+        self.order = names
+
+    def index(self, name):
+        return self.order.index(name)
+
+class FakeWindow:
+    def winfo_screenwidth(self):
+        return 1920
+
+    def winfo_screenheight(self):
+        return 1080
+
+class FakeSystem:
+    #Has only what "check_celestial" uses from "SolarSystem".
+    def __init__(self, text):
+        self.celestial_entry = FakeEntry(text)
+        self.search_index = SearchIndex(ENTRIES)
+        self.store = FakeStore([name for name, _ in ENTRIES])
+        self.window = FakeWindow()
+        self.shown = None
+
+    def hide_suggestions(self):
+        pass
+
+    def manage_frames(self, screen_width, screen_height, show_frame=None, index=None):
+        self.shown = index
+
+@pytest.fixture
+def messages(monkeypatch):
+    import tkinter.messagebox
+    shown = []
+    monkeypatch.setattr(tkinter.messagebox, "showerror", lambda title, text: shown.append(("error", text)))
+    monkeypatch.setattr(tkinter.messagebox, "showinfo", lambda title, text: shown.append(("info", text)))
+    return shown
+
+def test_check_celestial_name_and_alias(messages):
+    for text, index in (("Earth", 2), ("  terra ", 2), ("SOL", 5)):
+        ency = FakeSystem(text)
+        check_celestial(ency)
+        assert ency.shown == index
+    assert messages == []
+
+def test_check_celestial_moon(messages):
+    ency = FakeSystem("Moon")
+    check_celestial(ency)
+    assert ency.shown is None
+    assert messages[0][0] == "info"
+
+def test_check_celestial_suggestion(messages):
+    ency = FakeSystem("jupitr")
+    check_celestial(ency)
+    assert ency.shown is None    #A typo is not opened directly, but the closest body is suggested.
+    assert messages[0][0] == "error" and "Did you mean Jupiter?" in messages[0][1]
+    messages.clear()
+    check_celestial(FakeSystem("xyz"))
+    assert "Did you mean" not in messages[0][1]
+
+class FakeStyle:
+    def __init__(self):
+        self.configured = []
+
+    def configure(self, name, **options):
+        self.configured.append(name)
+
+def test_style_registry():
+    registry = StyleRegistry()
+    registry.style = FakeStyle()    #Avoids creating a ttk style, which needs a display.
+    name = registry.bar_style("Hydrogen")
+    assert registry.bar_style("Hydrogen") == name
+    assert registry.style.configured.count(name) == 1    #The style is only configured the first time.
+    assert "." not in registry.bar_style("Carbon Dioxide").split(".")[0]
+    registry.use_theme("dark")
+    assert registry.style.configured.count(name) == 2    #Switching the theme configures each style once more.
+
+def test_compound_color():
+    assert compound_color("Hydrogen") == compound_color("Hydrogen")
+    assert compound_color("Hydrogen") != compound_color("Helium")
+    assert compound_color("Hydrogen", "dark") != compound_color("Hydrogen")
@@ -0,0 +1,80 @@
+import os
+import sys
+from bodydata import SOURCES, SOURCE_ERRORS
+
+WATCH_INTERVAL = 1000    #Milliseconds between two checks of the files.
+IMAGES_DIR = "images"
+
+def snapshot(sources=SOURCES, images=IMAGES_DIR):
+    #Returns the modification time and size of the text sources and of every image. Only the folder entries are read, not the files.
+    files = {}
+    for path in sources.values():
+        try:
+            stat = os.stat(path)
+            files[path] = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            pass
+    folders = [images]
+    while folders:
+        try:
+            entries = list(os.scandir(folders.pop()))
+        except FileNotFoundError:
+            continue
+        for entry in entries:
+            if entry.is_dir():
+                folders.append(entry.path)
+            elif entry.name.lower().endswith(".png"):
+                stat = entry.stat()
+                files[entry.path] = (stat.st_mtime_ns, stat.st_size)
+    return files
+
+def keep_sources(files, previous):
+    #Gives the text sources their previous state, so they are compiled again at the next check.
+    for path in SOURCES.values():
+        if path in previous:
+            files[path] = previous[path]
+        else:
+            files.pop(path, None)
+
+class AssetWatcher:
+    def __init__(self, ency, interval=WATCH_INTERVAL):
+        #Checks the files of the application from the main loop and tells "ency" which ones have changed, without any external dependency.
+        self.ency = ency
+        self.interval = interval
+        self.files = snapshot()
+        self.timer = None
+        self.error = None    #Last error of the texts, so it is only reported once while they stay broken.
+
+    def start(self):
+        self.timer = self.ency.window.after(self.interval, self.poll)
+
+    def stop(self):
+        if self.timer is not None:
+            self.ency.window.after_cancel(self.timer)
+            self.timer = None
+
+    def poll(self):
+        try:
+            files = snapshot()
+            previous, self.files = self.files, files
+            changed = {path for path in files.keys() | previous.keys() if files.get(path) != previous.get(path)}
+            images = changed - set(SOURCES.values())
+            #The texts are reloaded first, because they can change the images used by the bodies. Added or removed photos change the list of photos of their body.
+            if changed & set(SOURCES.values()) or any(path not in files or path not in previous for path in images):
+                self.reload_texts(previous)
+            if images:
+                self.ency.reload_images(images)
+        finally:    #The files are still checked after an error, so the next change is displayed.
+            self.start()
+
+    def reload_texts(self, previous):
+        try:
+            self.ency.reload_texts()
+        except SOURCE_ERRORS as error:
+            #The application keeps the last data that could be compiled, and the texts are compiled again at the next check until they are fixed.
+            if str(error) != self.error:
+                print(f"The texts could not be reloaded: {error}", file=sys.stderr)
+            self.error = str(error)
+            keep_sources(self.files, previous)
+        else:
+            self.error = None